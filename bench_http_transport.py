@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP/2 multiplexing vs the pooled HTTP/1.1 client
+
+Starts two local asyncio stand-ins for EDGAR that serve the same Form 4
+document after a fixed delay (--latency, a stand-in for the round trip to
+SEC): a keep-alive HTTP/1.1 server and an HTTP/2 server (cleartext, prior
+knowledge; SEC negotiates h2 over TLS). Fetches --filings documents through
+schedule4_http.get_httpx with --concurrency in flight, and prints filings/s
+and how many TCP connections each transport opened.
+
+Usage
+-----
+python bench_http_transport.py
+python bench_http_transport.py --filings 2000 --concurrency 32 --latency 80
+
+Needs the `h2` package (see requirements.txt).
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import httpx
+
+from schedule4_corporate_buys import HEADERS
+from schedule4_http import (
+    RateLimiter,
+    RetryPolicy,
+    client_limits,
+    get_httpx,
+    http2_available,
+    make_async_client,
+)
+
+DOC = (
+    b'<?xml version="1.0"?>\n<ownershipDocument><issuer><issuerCik>0000123456'
+    b"</issuerCik><issuerName>Example Corp</issuerName><issuerTradingSymbol>EXMP"
+    b"</issuerTradingSymbol></issuer>" + b"<!-- padding -->" * 200 + b"</ownershipDocument>\n"
+)
+
+
+# ---- HTTP/1.1 stand-in ----
+def serve(protocol_factory) -> int:
+    # both stand-ins run on their own event loop thread, like a remote server
+    loop = asyncio.new_event_loop()
+    srv = loop.run_until_complete(loop.create_server(protocol_factory, "127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return srv.sockets[0].getsockname()[1]
+
+
+def start_http1(latency: float) -> tuple:
+    stats = {"connections": 0}
+    response = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: text/xml\r\n"
+        b"Content-Length: %d\r\n\r\n" % len(DOC) + DOC
+    )
+
+    class H1Protocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            stats["connections"] += 1
+            self.transport = transport
+            self.buf = b""
+
+        def data_received(self, data):
+            self.buf += data
+            while b"\r\n\r\n" in self.buf:  # GETs only, no bodies
+                _, self.buf = self.buf.split(b"\r\n\r\n", 1)
+                asyncio.ensure_future(self.respond())
+
+        async def respond(self):
+            await asyncio.sleep(latency)
+            if not self.transport.is_closing():
+                self.transport.write(response)
+
+    return serve(H1Protocol), stats
+
+
+# ---- HTTP/2 stand-in ----
+def start_http2(latency: float) -> tuple:
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    stats = {"connections": 0}
+
+    class H2Protocol(asyncio.Protocol):
+        def connection_made(self, transport):
+            stats["connections"] += 1
+            self.transport = transport
+            self.conn = h2.connection.H2Connection(
+                h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+            )
+            self.window_open = asyncio.Event()
+            self.conn.initiate_connection()
+            transport.write(self.conn.data_to_send())
+
+        def data_received(self, data):
+            for ev in self.conn.receive_data(data):
+                if isinstance(ev, h2.events.RequestReceived):
+                    asyncio.ensure_future(self.respond(ev.stream_id))
+                elif isinstance(ev, h2.events.WindowUpdated):
+                    self.window_open.set()
+                elif isinstance(ev, h2.events.ConnectionTerminated):
+                    self.transport.close()
+            self.transport.write(self.conn.data_to_send())
+
+        async def respond(self, stream_id: int):
+            await asyncio.sleep(latency)
+            self.conn.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "text/xml"),
+                    ("content-length", str(len(DOC))),
+                ],
+            )
+            body = DOC
+            while body:
+                window = min(
+                    self.conn.local_flow_control_window(stream_id),
+                    self.conn.max_outbound_frame_size,
+                )
+                if window < 1:
+                    self.window_open.clear()
+                    await self.window_open.wait()
+                    continue
+                chunk, body = body[:window], body[window:]
+                self.conn.send_data(stream_id, chunk, end_stream=not body)
+                self.transport.write(self.conn.data_to_send())
+
+    return serve(H2Protocol), stats
+
+
+# ---- Client side ----
+async def fetch_all(client: httpx.AsyncClient, base: str, n: int, concurrency: int):
+    rl = RateLimiter(rps=1e6, slow_s=float("inf"))  # measure the transport only
+    retry = RetryPolicy()
+    sem = asyncio.Semaphore(concurrency)
+    ok = 0
+
+    async def one(i: int):
+        nonlocal ok
+        async with sem:
+            r = await get_httpx(client, f"{base}/doc/{i}.xml", rl, retry)
+            if r is not None and r.status_code == 200 and r.content == DOC:
+                ok += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return ok, time.perf_counter() - t0
+
+
+def run(label: str, client: httpx.AsyncClient, port: int, stats: dict, args):
+    async def go():
+        async with client:
+            return await fetch_all(
+                client, f"http://127.0.0.1:{port}", args.filings, args.concurrency
+            )
+
+    ok, secs = asyncio.run(go())
+    print(
+        f"{label:>9}: {ok}/{args.filings} filings in {secs:.2f}s = "
+        f"{ok / secs:7.1f} filings/s over {stats['connections']} connection(s)"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--filings", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument(
+        "--latency", type=float, default=50.0, help="Server delay per request, ms"
+    )
+    args = ap.parse_args()
+    latency = args.latency / 1000.0
+
+    port1, stats1 = start_http1(latency)
+    run("HTTP/1.1", make_async_client(HEADERS, args.concurrency, http2=False), port1, stats1, args)
+
+    if not http2_available():
+        print("   HTTP/2: skipped (pip install h2)")
+        return
+    port2, stats2 = start_http2(latency)
+    # same pool settings as make_async_client, but h2 without TLS needs prior knowledge
+    h2c = httpx.AsyncClient(
+        headers=HEADERS,
+        limits=client_limits(args.concurrency),
+        http1=False,
+        http2=True,
+    )
+    run("HTTP/2", h2c, port2, stats2, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: parse_form4_filtered vs parse_schedule4_xml + filter_transactions
+
+Checks that both paths keep the same rows, then times each over the same
+documents. Uses the XML cached by schedule4_corporate_buys.py when there is
+any (real filings), otherwise a synthetic mix of typical Form 4 shapes:
+OTC issuers, individuals selling/receiving awards, and the occasional
+corporate 10% owner purchase priced in a footnote.
+
+Usage
+-----
+python bench_parse_form4.py                      # ~/.cache/schedule4/xml or synthetic
+python bench_parse_form4.py --synthetic 2000 --repeat 5
+python bench_parse_form4.py --cache_dir /path/to/cache --include_codes "P,C"
+"""
+
+import argparse
+import gzip
+import os
+import random
+import time
+from typing import List
+
+from schedule4_corporate_buys import (
+    DEFAULT_CACHE_DIR,
+    filter_transactions,
+    parse_form4_filtered,
+    parse_schedule4_xml,
+)
+
+TX = """
+  <nonDerivativeTransaction>
+    <securityTitle><value>Common Stock</value></securityTitle>
+    <transactionDate><value>2025-08-1{day}</value></transactionDate>
+    <transactionCoding><transactionFormType>4</transactionFormType>
+      <transactionCode>{code}</transactionCode></transactionCoding>
+    <transactionAmounts>
+      <transactionShares><value>{shares}</value></transactionShares>
+      <transactionPricePerShare>{price}</transactionPricePerShare>
+      <transactionAcquiredDisposedCode><value>A</value></transactionAcquiredDisposedCode>
+    </transactionAmounts>
+  </nonDerivativeTransaction>"""
+
+OWNER = """
+  <reportingOwner>
+    <reportingOwnerId><rptOwnerCik>000{cik}</rptOwnerCik>
+      <rptOwnerName>{name}</rptOwnerName></reportingOwnerId>
+    <reportingOwnerRelationship>
+      <isDirector>false</isDirector>
+      <isTenPercentOwner>{ten}</isTenPercentOwner>
+    </reportingOwnerRelationship>
+  </reportingOwner>"""
+
+DOC = """<?xml version="1.0"?>
+<ownershipDocument>
+  <schemaVersion>X0508</schemaVersion>
+  <documentType>4</documentType>
+  <periodOfReport>2025-08-12</periodOfReport>
+  <issuer><issuerCik>0000123456</issuerCik>
+    <issuerName>{issuer}</issuerName>
+    <issuerTradingSymbol>{symbol}</issuerTradingSymbol></issuer>
+  {owners}
+  <nonDerivativeTable>{txs}
+  </nonDerivativeTable>
+  <footnotes>
+    <footnote id="F1">The price reported is a weighted average price. These shares
+      were purchased in multiple transactions at prices ranging from $10.10 to
+      $10.45, inclusive.</footnote>
+  </footnotes>
+  <remarks>{remarks}</remarks>
+</ownershipDocument>"""
+
+
+def synthetic_doc(rng: random.Random) -> bytes:
+    kind = rng.random()
+    if kind < 0.15:
+        symbol, owners = "ABCD.PK", [("Smith John", "false")]
+    elif kind < 0.85:
+        symbol, owners = "ABCD", [(rng.choice(["Jane Doe", "John Q. Public"]), "false")]
+    else:
+        symbol = "ABCD"
+        owners = [("Activist Capital Partners LP", "true"), ("Jane Doe", "false")]
+    txs = []
+    for i in range(rng.randint(1, 8)):
+        code = rng.choice("SSSMAFP") if kind < 0.85 else rng.choice("PPC")
+        price = (
+            '<footnoteId id="F1"/>'
+            if rng.random() < 0.3
+            else f"<value>{rng.uniform(5, 50):.2f}</value>"
+        )
+        txs.append(TX.format(day=i % 10, code=code, shares=rng.randint(1, 10**5), price=price))
+    return DOC.format(
+        issuer="Example Corp",
+        symbol=symbol,
+        owners="".join(
+            OWNER.format(cik=n, name=name, ten=ten) for n, (name, ten) in enumerate(owners)
+        ),
+        txs="".join(txs),
+        remarks="Exhibit 24 - Power of Attorney",
+    ).encode("utf-8")
+
+
+def cached_docs(cache_dir: str, limit: int) -> List[bytes]:
+    docs = []
+    for dirpath, _, names in os.walk(os.path.join(cache_dir, "xml")):
+        for n in names:
+            if n.endswith(".xml.gz"):
+                with gzip.open(os.path.join(dirpath, n), "rb") as fh:
+                    docs.append(fh.read().partition(b"\n")[2])
+                if len(docs) >= limit:
+                    return docs
+    return docs
+
+
+def reference(doc: bytes, codes: set, tenpct: bool, drop_otc: bool):
+    header, txs = parse_schedule4_xml(doc)
+    return header, filter_transactions(header, txs, codes, tenpct, drop_otc), len(txs)
+
+
+def best_of(fn, docs, repeat: int, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for d in docs:
+            fn(d, *args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR)
+    ap.add_argument("--limit", type=int, default=5000, help="Max cached docs to load")
+    ap.add_argument(
+        "--synthetic", type=int, default=0, help="Use N synthetic docs instead of the cache"
+    )
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--include_codes", default="P,C")
+    ap.add_argument("--no_tenpct_filter", action="store_true")
+    ap.add_argument("--keep_otc", action="store_true")
+    args = ap.parse_args()
+
+    docs = [] if args.synthetic else cached_docs(args.cache_dir, args.limit)
+    source = f"cached filings in {args.cache_dir}"
+    if not docs:
+        rng = random.Random(4)
+        docs = [synthetic_doc(rng) for _ in range(args.synthetic or 2000)]
+        source = "synthetic filings"
+    codes = {c.strip().upper() for c in args.include_codes.split(",") if c.strip()}
+    opts = (codes, not args.no_tenpct_filter, not args.keep_otc)
+
+    kept = 0
+    for d in docs:
+        want = reference(d, *opts)
+        got = parse_form4_filtered(d, *opts)
+        assert got == want, f"parsers disagree:\n{want}\n{got}"
+        kept += len(got[1])
+    print(f"{len(docs)} {source}, {kept} kept rows (identical in both parsers)")
+
+    old = best_of(reference, docs, args.repeat, *opts)
+    new = best_of(parse_form4_filtered, docs, args.repeat, *opts)
+    for label, secs in (("parse + filter", old), ("parse_form4_filtered", new)):
+        print(f"{label:>22}: {secs * 1e6 / len(docs):8.1f} us/doc  ({secs:.3f}s)")
+    print(f"{'speedup':>22}: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,38 +19,78 @@ python schedule4_corporate_buys.py --date 2025-08-12 --csv out.csv \
 python schedule4_corporate_buys.py --start 2025-08-01 --end 2025-08-12 --csv out.csv \
   --user_agent "Your Name <you@example.com>"
 
+# backfill: one full-index per quarter, one CSV per day, resumable
+python schedule4_corporate_buys.py --start 2024-01-01 --end 2024-12-31 \
+  --out_dir form4_2024 --user_agent "Your Name <you@example.com>"
+
 Options (key ones)
 ------------------
 --include_codes "P,C"    Transaction codes to include (default P,C).
 --no_tenpct_filter       Include all filers (not just 10% owners).
 --keep_otc               Keep OTC/foreign symbols (more noise).
---sleep 0.3              Delay between HTTP requests (seconds).
+--sleep 0.3              Delay between filings (sync engine only).
 --print_passed           Print one line per kept row (live feedback).
+--engine async|sync      Concurrent httpx pipeline (default) or sequential requests.
+--out_dir DIR            One CSV per filing date; finished days are skipped.
+--resume                 Append to --csv only the filings not yet written.
+--deadline 45            Stop after 45 minutes; the rest is left to the next run.
+--watch                  Poll the current-filings feed instead of daily indexes.
+
+python schedule4_corporate_buys.py --help lists the rest; the README explains them.
 """
 
 import argparse
 import csv
 import datetime as dt
+import glob
 import gzip
+import hashlib
+import json
+import math
+import os
 import re
+import sqlite3
 import sys
 import time
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from io import BytesIO
-from typing import Iterable, List, Optional, Tuple, Dict, Any
+from typing import Callable, Iterable, List, Optional, Tuple, Dict, Any
 from urllib.parse import urljoin
 import asyncio
 import httpx
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import requests
 from lxml import etree
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import random
+
+from schedule4_http import (
+    BREAKERS,
+    COALESCE,
+    METRICS,
+    CircuitBreaker,
+    Hedger,
+    RateLimiter,
+    RetryPolicy,
+    SharedBudget,
+    breaker_tripped,
+    fcntl,
+    get_httpx,
+    host_of,
+    http2_available,
+    get_with_retries,
+    make_async_client,
+    make_session,
+)
 
 EDGAR_ARCHIVES = "https://www.sec.gov/Archives/"
-DAILY_FORM_INDEX = (
-    "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{q}/form.{ymd}.idx"
+DAILY_INDEX_DIR = "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{q}/"
+DAILY_FORM_INDEX = DAILY_INDEX_DIR + "form.{ymd}.idx"
+FULL_FORM_INDEX = "https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{q}/form.idx"
+COMPANY_TICKERS_EXCHANGE = "https://www.sec.gov/files/company_tickers_exchange.json"
+CURRENT_FEED = (
+    "https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type=4"
+    "&owner=include&start={start}&count={count}&output=atom"
 )
 
 # SEC requires a real User-Agent with contact info
@@ -83,41 +123,170 @@ def iter_dates(start: dt.date, end: dt.date) -> Iterable[dt.date]:
         d += dt.timedelta(days=1)
 
 
-# --- add this helper near top-level ---
-def recent_available_days(
-    n: int, session: requests.Session, max_lookback: int = 14
-) -> list[dt.date]:
+# ---- Daily index store ----
+class IndexStore:
     """
-    Walk backward from today and collect the latest n dates that have a
-    daily 'form.YYYYMMDD.idx' available (HTTP 200). Skips weekends/holidays/early days.
+    Keeps every daily index fetched during the run in memory and, when `root`
+    is set, on disk across runs. A copy downloaded after its day was over is
+    final and never requested again; anything newer (today's index) is
+    revalidated with If-None-Match / If-Modified-Since so polling costs a 304.
     """
-    found: list[dt.date] = []
-    day = dt.date.today()
-    attempts = 0
-    while len(found) < n and attempts < max_lookback:
-        idx_text = fetch_daily_schedule_index(day, session)
-        if idx_text:
-            found.append(day)
-        else:
-            print(f"[WARN] No index for {day}")
-        day -= dt.timedelta(days=1)
-        attempts += 1
-    return sorted(found)  # oldest→newest
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self._mem: Dict[dt.date, Optional[str]] = {}
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def _paths(self, day: dt.date) -> Tuple[str, str]:
+        base = os.path.join(self.root, f"form.{day:%Y%m%d}.idx")
+        return base + ".gz", base + ".json"
+
+    def _meta(self, day: dt.date) -> dict:
+        if not self.root:
+            return {}
+        try:
+            with open(self._paths(day)[1], encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _read(self, day: dt.date) -> Optional[str]:
+        try:
+            with gzip.open(self._paths(day)[0], "rt", encoding="utf-8") as fh:
+                return fh.read()
+        except (OSError, EOFError):
+            return None
+
+    def lookup(self, day: dt.date) -> Tuple[bool, Optional[str]]:
+        """(True, text) if no request is needed; text is None for a known miss."""
+        if day in self._mem:
+            return True, self._mem[day]
+        meta = self._meta(day)
+        if meta.get("fetched_on", "") > day.isoformat():
+            text = self._read(day)
+            if text is not None:
+                self._mem[day] = text
+                return True, text
+        return False, None
+
+    def conditional_headers(self, day: dt.date) -> Dict[str, str]:
+        meta = self._meta(day)
+        h = {}
+        if meta.get("etag"):
+            h["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            h["If-Modified-Since"] = meta["last_modified"]
+        return h
+
+    def not_modified(self, day: dt.date) -> Optional[str]:
+        text = self._read(day)
+        if text is not None:
+            meta = self._meta(day)
+            meta["fetched_on"] = dt.date.today().isoformat()
+            self._write_meta(day, meta)
+        self._mem[day] = text
+        return text
+
+    def save(self, day: dt.date, text: str, headers) -> None:
+        self._mem[day] = text
+        if not self.root:
+            return
+        gz_path, _ = self._paths(day)
+        tmp = f"{gz_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp, gz_path)
+        self._write_meta(
+            day,
+            {
+                "etag": headers.get("ETag", ""),
+                "last_modified": headers.get("Last-Modified", ""),
+                "fetched_on": dt.date.today().isoformat(),
+            },
+        )
+
+    def missing(self, day: dt.date) -> None:
+        self._mem[day] = None
+
+    def _write_meta(self, day: dt.date, meta: dict) -> None:
+        if not self.root:
+            return
+        _, meta_path = self._paths(day)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, meta_path)
 
 
 # ---- Fetch daily index (gzip-safe) ----
+def daily_index_url(day: dt.date) -> str:
+    ymd = day.strftime("%Y%m%d")
+    return DAILY_FORM_INDEX.format(year=day.year, q=quarter_of(day), ymd=ymd)
+
+
 def fetch_daily_schedule_index(
-    day: dt.date, session: requests.Session
+    day: dt.date,
+    session: requests.Session,
+    store: Optional[IndexStore] = None,
+    mode: str = "full",
+    deadline: Optional["Deadline"] = None,
 ) -> Optional[str]:
-    ymd = day.strftime("%Y%m%d")
-    url = DAILY_FORM_INDEX.format(year=day.year, q=quarter_of(day), ymd=ymd)
-    r = session.get(url, headers=HEADERS, timeout=30)
-    if r.status_code != 200:
+    return fetch_form_index(daily_index_url(day), day, session, store, mode, deadline)
+
+
+def fetch_form_index(
+    url: str,
+    day: dt.date,
+    session: requests.Session,
+    store: Optional[IndexStore] = None,
+    mode: str = "full",
+    deadline: Optional["Deadline"] = None,
+) -> Optional[str]:
+    """
+    Form index text (daily or quarterly; `day` is the store key), or None
+    if it is missing or could not be fetched. mode="range" downloads only
+    the header and the Form 4 / 4/A rows via HTTP Range, falling back to
+    the whole file. Requests are cut short by `deadline`.
+    """
+    deadline = deadline or Deadline()
+    headers = HEADERS
+    if store:
+        done, text = store.lookup(day)
+        if done:
+            return text
+        headers = {**HEADERS, **store.conditional_headers(day)}
+    text = None
+    try:
+        if mode == "range":
+            r, text = fetch_form4_section(url, session, headers, deadline)
+            if r.status_code == 206 and text is None:
+                r = session.get(url, headers=headers, timeout=deadline.timeout())
+        else:
+            r = session.get(url, headers=headers, timeout=deadline.timeout())
+    except requests.exceptions.RequestException as e:
+        # e.g. MaxRetryError once the circuit breaker opens: the day is
+        # left unfinished, as for a missing index
+        print(f"[WARN] {url}: {e}")
+        return None
+    if r.status_code == 304 and store:
+        return store.not_modified(day)
+    if text is None and r.status_code != 200:
+        if store:
+            store.missing(day)
         return None
-    # If server handles gzip, requests already decoded into .text
-    if r.headers.get("Content-Encoding", "").lower() == "gzip":
-        return r.text
-    raw = r.content
+    if text is None:
+        # If server handles gzip, requests already decoded into .text
+        if r.headers.get("Content-Encoding", "").lower() == "gzip":
+            text = r.text
+        else:
+            text = decode_index_bytes(r.content)
+    if store:
+        store.save(day, text, r.headers)
+    return text
+
+
+def decode_index_bytes(raw: bytes) -> str:
     # Some edges serve gzipped bytes w/o header; sniff magic
     if len(raw) >= 2 and raw[0] == 0x1F and raw[1] == 0x8B:
         with gzip.GzipFile(fileobj=BytesIO(raw)) as gz:
@@ -125,36 +294,446 @@ def fetch_daily_schedule_index(
     return raw.decode("latin-1", errors="ignore")
 
 
+# ---- Index day discovery ----
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> dt.date:
+    # n-th (1-based) weekday of the month; n=-1 means the last one
+    if n > 0:
+        d = dt.date(year, month, 1)
+        d += dt.timedelta(days=(weekday - d.weekday()) % 7)
+        return d + dt.timedelta(weeks=n - 1)
+    d = dt.date(year + month // 12, month % 12 + 1, 1) - dt.timedelta(days=1)
+    return d - dt.timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _observed(d: dt.date) -> dt.date:
+    if d.weekday() == 5:
+        return d - dt.timedelta(days=1)
+    if d.weekday() == 6:
+        return d + dt.timedelta(days=1)
+    return d
+
+
+def edgar_holidays(year: int) -> set:
+    """
+    Days EDGAR does not disseminate: the US federal holidays (5 U.S.C. 6103)
+    with Saturday/Sunday shifted to the observed Friday/Monday.
+    """
+    out = set()
+    for y in (year, year + 1):  # Jan 1 on a Saturday is observed on Dec 31
+        fixed = [dt.date(y, 1, 1), dt.date(y, 7, 4), dt.date(y, 11, 11), dt.date(y, 12, 25)]
+        if y >= 2021:
+            fixed.append(dt.date(y, 6, 19))
+        out.update(_observed(d) for d in fixed)
+        out.update(
+            {
+                _nth_weekday(y, 1, 0, 3),  # Martin Luther King Jr. Day
+                _nth_weekday(y, 2, 0, 3),  # Washington's Birthday
+                _nth_weekday(y, 5, 0, -1),  # Memorial Day
+                _nth_weekday(y, 9, 0, 1),  # Labor Day
+                _nth_weekday(y, 10, 0, 2),  # Columbus Day
+                _nth_weekday(y, 11, 3, 4),  # Thanksgiving
+            }
+        )
+    return {d for d in out if d.year == year}
+
+
+def is_business_day(day: dt.date) -> bool:
+    return day.weekday() < 5 and day not in edgar_holidays(day.year)
+
+
+def listed_index_days(
+    year: int, q: int, session: requests.Session, timeout: float = 30
+) -> Optional[set]:
+    """
+    Dates with a form.YYYYMMDD.idx in the quarter's daily-index directory
+    (one small JSON listing), or None if the listing is unavailable.
+    """
+    url = DAILY_INDEX_DIR.format(year=year, q=q) + "index.json"
+    try:
+        r = session.get(url, headers=HEADERS, timeout=timeout)
+        items = r.json()["directory"]["item"] if r.status_code == 200 else None
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        items = None
+    if items is None:
+        return None
+    out = set()
+    for it in items:
+        m = re.fullmatch(r"form\.(\d{8})\.idx", it.get("name", ""))
+        if m:
+            out.add(dt.datetime.strptime(m.group(1), "%Y%m%d").date())
+    return out
+
+
+def index_exists(day: dt.date, session: requests.Session, timeout: float = 30) -> bool:
+    try:
+        r = session.head(daily_index_url(day), headers=HEADERS, timeout=timeout)
+    except requests.exceptions.RequestException:
+        return False
+    return r.status_code == 200
+
+
+def recent_available_days(
+    n: int,
+    session: requests.Session,
+    max_lookback: int = 14,
+    store: Optional[IndexStore] = None,
+    deadline: Optional["Deadline"] = None,
+) -> list[dt.date]:
+    """
+    Latest n dates that have a daily 'form.YYYYMMDD.idx'. Weekends and
+    holidays are skipped from the calendar; the remaining candidates are
+    checked against the quarterly directory listing (HEAD per day if the
+    listing is unavailable), so no index file is downloaded here.
+    """
+    deadline = deadline or Deadline()
+    max_lookback = max(max_lookback, 2 * n + 7)
+    candidates = []
+    day = dt.date.today()
+    for _ in range(max_lookback):
+        if is_business_day(day):
+            candidates.append(day)
+        day -= dt.timedelta(days=1)
+
+    listings: Dict[Tuple[int, int], Optional[set]] = {}
+    found: list[dt.date] = []
+    for day in candidates:
+        if len(found) >= n:
+            break
+        done, text = store.lookup(day) if store else (False, None)
+        if done:
+            ok = text is not None
+        else:
+            key = (day.year, quarter_of(day))
+            if key not in listings:
+                listings[key] = listed_index_days(*key, session, deadline.timeout())
+            listed = listings[key]
+            if listed is not None:
+                ok = day in listed
+            else:
+                ok = index_exists(day, session, deadline.timeout())
+        if ok:
+            found.append(day)
+        else:
+            print(f"[WARN] No index for {day}")
+    return sorted(found)  # oldest→newest
+
+
+# ---- Range-fetch the Form 4 section of a daily index ----
+# form.YYYYMMDD.idx is sorted by form type, so the "4" and "4/A" rows form one
+# contiguous block. Bisect for its start with small Range probes, then stream
+# ranges from there until the first row past "4/A".
+INDEX_PROBE_BYTES = 8 * 1024
+INDEX_STREAM_BYTES = 256 * 1024
+
+
+def _index_form_type(line: bytes) -> str:
+    parts = line.split(None, 1)
+    return parts[0].decode("latin-1").upper() if parts else ""
+
+
+def _get_range(
+    session: requests.Session,
+    url: str,
+    headers: dict,
+    start: int,
+    end: int,
+    timeout: float = 30,
+) -> Optional[bytes]:
+    r = session.get(
+        url, headers={**headers, "Range": f"bytes={start}-{end}"}, timeout=timeout
+    )
+    return r.content if r.status_code == 206 else None
+
+
+def fetch_form4_section(
+    url: str,
+    session: requests.Session,
+    headers: dict,
+    deadline: Optional["Deadline"] = None,
+) -> Tuple[requests.Response, Optional[str]]:
+    """
+    Returns the first response (for status / validators) and the text of the
+    index header plus its Form 4 rows. The text is None whenever the caller
+    should treat the response as a plain GET: Range ignored (200), 304, 404,
+    or anything unexpected mid-way (then a full download is safest).
+    """
+    deadline = deadline or Deadline()
+    # byte offsets must refer to the file itself, not a compressed stream
+    headers = {**headers, "Accept-Encoding": "identity"}
+    r = session.get(
+        url,
+        headers={**headers, "Range": f"bytes=0-{INDEX_PROBE_BYTES - 1}"},
+        timeout=deadline.timeout(),
+    )
+    cr = r.headers.get("Content-Range", "")
+    if r.status_code != 206 or "/" not in cr or cr.endswith("/*"):
+        return r, None
+    total = int(cr.rsplit("/", 1)[1])
+    head = r.content
+    if len(head) >= total:
+        return r, decode_index_bytes(head)
+    sep = re.search(rb"^-{20,}\s*$", head, flags=re.MULTILINE)
+    if sep is None:
+        return r, None
+    data_start = sep.end() + 1
+    preamble = head[:data_start].decode("latin-1", errors="ignore")
+    headers = {k: v for k, v in headers.items() if not k.startswith("If-")}
+
+    def first_type_after(off: int) -> Optional[str]:
+        chunk = _get_range(
+            session, url, headers, off, off + INDEX_PROBE_BYTES - 1, deadline.timeout()
+        )
+        if chunk is None:
+            raise LookupError(off)
+        nl = chunk.find(b"\n")
+        line = chunk[nl + 1 :].split(b"\n", 1)[0] if nl >= 0 else b""
+        return _index_form_type(line) if line else None
+
+    try:
+        lo, hi = data_start, total
+        while hi - lo > INDEX_STREAM_BYTES:
+            mid = (lo + hi) // 2
+            t = first_type_after(mid)
+            if t is not None and t < "4":
+                lo = mid
+            else:
+                hi = mid
+
+        rows: List[bytes] = []
+        if lo == data_start:  # reuse the rows already in the first probe
+            pos, buf, skip_partial = len(head), head[data_start:], False
+        else:
+            pos, buf, skip_partial = lo, b"", True
+        while pos < total:
+            end = min(pos + INDEX_STREAM_BYTES, total) - 1
+            chunk = _get_range(session, url, headers, pos, end, deadline.timeout())
+            if chunk is None:
+                raise LookupError(pos)
+            pos += len(chunk)
+            lines = (buf + chunk).split(b"\n")
+            buf = lines.pop() if pos < total else b""
+            if skip_partial:
+                lines, skip_partial = lines[1:], False
+            for line in lines:
+                t = _index_form_type(line)
+                if t in ("4", "4/A"):
+                    rows.append(line)
+                elif t > "4/A":
+                    pos = total
+                    break
+    except (LookupError, requests.exceptions.RequestException):
+        return r, None
+    if not rows:
+        return r, None
+    return r, preamble + b"\n".join(rows).decode("latin-1", errors="ignore") + "\n"
+
+
 # ---- Parse fixed-width index ----
 # Example row (fixed-width columns):
 # 4/A            SOME COMPANY INC.                                   0000123456  20250812    edgar/data/123456/0000123456-25-000123.txt
+# (the quarterly full-index/form.idx has the same layout with 2025-08-12 dates)
 FORM4_ROW = re.compile(
     r"^(?P<schedule>4(?:/\w+)?)\s{2,}"
     r"(?P<company>.+?)\s{2,}"
     r"(?P<cik>\d{7,10})\s{2,}"
-    r"(?P<date>\d{8})\s{2,}"
-    r"(?P<file>edgar/data/\d+/\d{10}-\d{2}-\d{6}\.txt)\s*$",
-    re.MULTILINE,
+    r"(?P<date>\d{8}|\d{4}-\d{2}-\d{2})\s{2,}"
+    r"(?P<file>edgar/data/\d+/\d{10}-\d{2}-\d{6}\.txt)\s*$"
 )
 
 
 def parse_schedule_index(idx_text: str) -> List[FilingRef]:
-    out: List[FilingRef] = []
-    for m in FORM4_ROW.finditer(idx_text):
+    return list(iter_schedule_index(idx_text.splitlines()))
+
+
+def iter_schedule_index(lines: Iterable[str]) -> Iterable[FilingRef]:
+    """Form 4 / 4/A rows, one line at a time."""
+    for line in lines:
+        if not line.startswith("4"):
+            continue
+        m = FORM4_ROW.match(line)
+        if not m:
+            continue
         ft = m.group("schedule").upper()
         if not (ft == "4" or ft.startswith("4/")):  # includes 4/A
             continue
-        date = m.group("date")
-        out.append(
-            FilingRef(
-                cik=m.group("cik"),
-                company_name=m.group("company").strip(),
-                schedule_type=m.group("schedule").strip(),
-                date_filed=f"{date[0:4]}-{date[4:6]}-{date[6:8]}",
-                txt_path=m.group("file"),
-            )
+        date = m.group("date").replace("-", "")  # full-index uses YYYY-MM-DD
+        yield FilingRef(
+            cik=m.group("cik"),
+            company_name=m.group("company").strip(),
+            schedule_type=m.group("schedule").strip(),
+            date_filed=f"{date[0:4]}-{date[4:6]}-{date[6:8]}",
+            txt_path=m.group("file"),
+        )
+
+
+# ---- Quarterly backfill ----
+def quarter_end(year: int, q: int) -> dt.date:
+    return dt.date(year + q // 4, q % 4 * 3 + 1, 1) - dt.timedelta(days=1)
+
+
+def backfill_filings(
+    start: dt.date,
+    end: dt.date,
+    session: requests.Session,
+    store: Optional[IndexStore] = None,
+    mode: str = "full",
+    deadline: Optional["Deadline"] = None,
+) -> Dict[dt.date, List[FilingRef]]:
+    """
+    Form 4 filings per filing date in [start, end], read from each quarter's
+    full-index/form.idx (one index per quarter instead of one per day).
+    Quarterly indexes are stored under their quarter's last day, so a copy
+    taken after the quarter closed is final.
+    """
+    by_day: Dict[dt.date, List[FilingRef]] = {}
+    quarters = sorted({(d.year, quarter_of(d)) for d in iter_dates(start, end)})
+    for year, q in quarters:
+        url = FULL_FORM_INDEX.format(year=year, q=q)
+        text = fetch_form_index(
+            url, quarter_end(year, q), session, store, mode, deadline
+        )
+        if not text:
+            print(f"[WARN] No full index for {year} QTR{q}")
+            continue
+        for f in iter_schedule_index(text.splitlines()):
+            d = dt.date.fromisoformat(f.date_filed)
+            if start <= d <= end:
+                by_day.setdefault(d, []).append(f)
+    return dict(sorted(by_day.items()))
+
+
+# ---- Current-filings feed (--watch) ----
+# One Atom <entry> per filing and CIK (the issuer and each reporting owner):
+#   <title>4 - Example Corp (0000123456) (Issuer)</title>
+#   <link href=".../edgar/data/123456/000012345626000123/0000123456-26-000123-index.htm"/>
+#   <summary><b>Filed:</b> 2026-10-15 <b>AccNo:</b> 0000123456-26-000123 ...</summary>
+#   <updated>2026-10-15T16:05:12-04:00</updated>  (SEC acceptance time)
+ATOM = "{http://www.w3.org/2005/Atom}"
+FEED_TITLE_RE = re.compile(r"^(?P<form>\S+) - (?P<company>.+?) \((?P<cik>\d{7,10})\)")
+FEED_FOLDER_RE = re.compile(r"/edgar/data/(\d+)/")
+FEED_ACC_RE = re.compile(r"\d{10}-\d{2}-\d{6}")
+FEED_FILED_RE = re.compile(r"Filed:</b>\s*(\d{4}-\d{2}-\d{2})")
+
+
+def parse_current_feed(raw: bytes) -> Tuple[List[Tuple[FilingRef, float]], int]:
+    """
+    Form 4 / 4/A entries of one feed page, newest first, with acceptance
+    epochs, and the page's entry count before filtering (type=4 also matches
+    424B2, 425, ...).
+    """
+    out = []
+    root = etree.fromstring(raw)
+    entries = root.findall(ATOM + "entry")
+    for e in entries:
+        m = FEED_TITLE_RE.match(e.findtext(ATOM + "title") or "")
+        link = e.find(ATOM + "link")
+        folder = FEED_FOLDER_RE.search("" if link is None else link.get("href", ""))
+        acc = FEED_ACC_RE.search(e.findtext(ATOM + "id") or "")
+        filed = FEED_FILED_RE.search(e.findtext(ATOM + "summary") or "")
+        if not (m and folder and acc and filed):
+            continue
+        ft = m.group("form").upper()
+        if not (ft == "4" or ft.startswith("4/")):
+            continue
+        updated = e.findtext(ATOM + "updated")
+        try:
+            accepted = dt.datetime.fromisoformat(updated).timestamp()
+        except (TypeError, ValueError):
+            accepted = time.time()
+        ref = FilingRef(
+            cik=m.group("cik"),
+            company_name=m.group("company").strip(),
+            schedule_type=ft,
+            date_filed=filed.group(1),
+            txt_path=f"edgar/data/{folder.group(1)}/{acc.group(0)}.txt",
+        )
+        out.append((ref, accepted))
+    return out, len(entries)
+
+
+class CurrentFeed:
+    """
+    --watch: polls EDGAR's current-events feed for Form 4 (newest first) with
+    If-None-Match / If-Modified-Since and returns only accessions it has not
+    returned before, oldest first. A busy interval can spill past one page,
+    so pages are followed until one reaches a seen accession (MAX_PAGES at
+    most; the first poll reads one page). A filing has an entry per CIK; the
+    one kept prefers a listed CIK so the issuer map does not drop it. The
+    seen set is bounded; the run ledger is what dedupes across runs.
+    """
+
+    PAGE = 100
+    MAX_PAGES = 10
+    SEEN_MAX = 50_000
+
+    def __init__(
+        self, session: requests.Session, issuer_map: Optional["IssuerMap"] = None
+    ):
+        self.session = session
+        self.issuer_map = issuer_map
+        self.seen: "OrderedDict[str, float]" = OrderedDict()  # accession -> accepted
+        self._validators: Dict[str, str] = {}
+        self.polls = 0
+        self.unchanged = 0
+        self.new = 0
+
+    def _page(self, page: int, timeout: float = 30) -> Optional[requests.Response]:
+        url = CURRENT_FEED.format(start=page * self.PAGE, count=self.PAGE)
+        headers = {**HEADERS, **self._validators} if page == 0 else HEADERS
+        try:
+            r = self.session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"[WARN] Current-filings feed: {e}")
+            return None
+        if page == 0 and r.status_code == 200:
+            validators = {"If-None-Match": "ETag", "If-Modified-Since": "Last-Modified"}
+            self._validators = {
+                k: r.headers[h] for k, h in validators.items() if r.headers.get(h)
+            }
+        return r
+
+    def poll(self, deadline: Optional["Deadline"] = None) -> List[Tuple[FilingRef, float]]:
+        deadline = deadline or Deadline()
+        self.polls += 1
+        fresh: Dict[str, Tuple[FilingRef, float]] = {}
+        for page in range(self.MAX_PAGES if self.seen else 1):
+            r = self._page(page, deadline.timeout())
+            if r is not None and r.status_code == 304:
+                self.unchanged += 1
+                break
+            if r is None or r.status_code != 200:
+                if r is not None:
+                    print(f"[WARN] Current-filings feed: HTTP {r.status_code}")
+                break
+            entries, n_entries = parse_current_feed(r.content)
+            caught_up = False
+            for f, accepted in entries:
+                acc = accession_of(f.txt_path)
+                if acc in self.seen:
+                    caught_up = True
+                    continue
+                prev = fresh.get(acc)
+                if prev is None or (
+                    self.issuer_map
+                    and self.issuer_map.listed(f.cik)
+                    and not self.issuer_map.listed(prev[0].cik)
+                ):
+                    fresh[acc] = (f, accepted)
+            if caught_up or n_entries < self.PAGE:  # a short page is the last
+                break
+        new = sorted(fresh.values(), key=lambda e: e[1])
+        for f, accepted in new:
+            self.seen[accession_of(f.txt_path)] = accepted
+        while len(self.seen) > self.SEEN_MAX:
+            self.seen.popitem(last=False)
+        self.new += len(new)
+        return new
+
+    def report(self) -> str:
+        return (
+            f"Current feed: {self.polls} polls ({self.unchanged} not modified), "
+            f"{self.new} new filings"
         )
-    return out
 
 
 # ---- From .txt to XML candidates ----
@@ -167,46 +746,344 @@ def xml_candidates_from_txt(txt_path: str) -> Tuple[str, List[str]]:
     return index_url, [dir_url + "form4.xml", dir_url + "primary_doc.xml"]
 
 
-def fetch_xml(url: str, session: requests.Session) -> Optional[bytes]:
-    # Separate connect/read timeouts; SEC can be slow on read
-    connect_t, read_t = 5, 60
-    tries = 4
-    for i in range(tries):
-        try:
-            r = session.get(url, headers=HEADERS, timeout=(connect_t, read_t))
-            if (
-                r.status_code == 200
-                and "xml" in r.headers.get("Content-Type", "").lower()
-            ):
-                return r.content
-            # 404 or wrong content: no point retrying further
-            if r.status_code == 404:
-                return None
-        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout):
-            # exponential backoff with jitter
-            time.sleep((2**i) * 0.5 + random.random() * 0.2)
-            continue
-        except requests.exceptions.RequestException:
-            # transient network error → backoff and retry
-            time.sleep((2**i) * 0.5 + random.random() * 0.2)
-            continue
-        break
+def fetch_xml(
+    url: str,
+    session: requests.Session,
+    stats: Optional["ProbeStats"] = None,
+    tries: int = 4,
+) -> Optional[bytes]:
+    if breaker_tripped(host_of(url)):
+        return None  # would not be requested; not a try either
+    if stats:
+        if stats.known_missing(url):
+            return None
+        stats.requests += 1
+    r = get_with_retries(url, session, tries)
+    # 404 or wrong content: no point retrying further
+    if r is not None and r.status_code == 404 and stats:
+        stats.not_found(url)
+    if (
+        r is not None
+        and r.status_code == 200
+        and "xml" in r.headers.get("Content-Type", "").lower()
+    ):
+        return r.content
     return None
 
 
-def find_xml_via_index(index_url: str, session: requests.Session) -> Optional[str]:
+def find_xml_via_index(
+    index_url: str,
+    session: requests.Session,
+    stats: Optional["ProbeStats"] = None,
+    tries: int = 4,
+) -> Tuple[Optional[str], Optional[bytes]]:
+    if stats:
+        stats.requests += 1
     try:
         r = session.get(index_url, headers=HEADERS, timeout=(5, 60))
     except requests.exceptions.RequestException:
-        return None
+        return None, None
     if r.status_code != 200:
-        return None
+        return None, None
     for href in re.findall(r'href="([^"]+\.xml)"', r.text, flags=re.IGNORECASE):
         xml_url = urljoin(index_url, href)
-        xb = fetch_xml(xml_url, session)
+        xb = fetch_xml(xml_url, session, stats, tries)
         if xb and b"<ownershipDocument" in xb:
-            return xml_url
-    return None
+            return xml_url, xb
+    return None, None
+
+
+# ---- Full submission .txt ----
+# The accession's .txt bundles every document of the filing; the ownership
+# XML sits in a <DOCUMENT> as <FILENAME>name.xml ... <XML>...</XML>.
+SUBMISSION_DOC_RE = re.compile(rb"<DOCUMENT>(.*?)</DOCUMENT>", re.S)
+SUBMISSION_XML_RE = re.compile(rb"<XML>\s*(.*?)\s*</XML>", re.S)
+SUBMISSION_FILENAME_RE = re.compile(rb"<FILENAME>([^\r\n<]+)")
+
+
+def ownership_xml_from_submission(
+    txt: bytes, dir_url: str
+) -> Tuple[Optional[str], Optional[bytes]]:
+    """(xml_url, xml bytes) of the embedded ownershipDocument, if any."""
+    for doc in SUBMISSION_DOC_RE.finditer(txt):
+        body = doc.group(1)
+        if b"<ownershipDocument" not in body:
+            continue
+        x = SUBMISSION_XML_RE.search(body)
+        if not x:
+            continue
+        fn = SUBMISSION_FILENAME_RE.search(body)
+        name = fn.group(1).strip().decode("latin-1") if fn else ""
+        return (dir_url + name if name else ""), x.group(1)
+    return None, None
+
+
+def submission_urls(txt_path: str) -> Tuple[str, str]:
+    # (full submission .txt, accession folder) URLs
+    return urljoin(EDGAR_ARCHIVES, txt_path), accession_url(txt_path) + "/"
+
+
+ARCHIVE_CIK_DIR = re.compile(r"/edgar/data/\d+/")
+
+
+def archive_key(url: str) -> str:
+    # the same document under any listing's CIK folder (see one_per_accession);
+    # the COALESCE key
+    return ARCHIVE_CIK_DIR.sub("/edgar/data/", url, count=1)
+
+
+# ---- On-disk XML cache ----
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "schedule4")
+
+
+def accession_of(txt_path: str) -> str:
+    # edgar/data/CIK/0001234567-25-000123.txt -> 0001234567-25-000123
+    return txt_path.rsplit("/", 1)[1].replace(".txt", "")
+
+
+def one_per_accession(filings: List[FilingRef]) -> List[FilingRef]:
+    # EDGAR lists a Form 4 under the issuer's and each reporting owner's CIK,
+    # and every one of those folders serves the same documents; keep the
+    # first listing so every run writes the filing once, resumed or not
+    seen = set()
+    out = []
+    for f in filings:
+        acc = accession_of(f.txt_path)
+        if acc not in seen:
+            seen.add(acc)
+            out.append(f)
+    return out
+
+
+class XmlCache:
+    """
+    Filed Form 4 documents never change, so the resolved ownership XML is
+    stored once per accession (gzip, with its path inside the accession
+    folder on the first line) and reused by later runs. get() rebuilds
+    xml_url under the folder of the listing asking for it (see
+    one_per_accession), whichever listing was fetched first. Files
+    live under sha1(accession) buckets; the total size is capped and the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # path -> size
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        found = []
+        for dirpath, _, names in os.walk(root):
+            for n in names:
+                if n.endswith(".xml.gz"):
+                    p = os.path.join(dirpath, n)
+                    st = os.stat(p)
+                    found.append((st.st_mtime, p, st.st_size))
+        for _, p, size in sorted(found):
+            self._entries[p] = size
+            self._total += size
+        self._evict()
+
+    def _path(self, accession: str) -> str:
+        h = hashlib.sha1(accession.encode()).hexdigest()
+        return os.path.join(self.root, h[:2], f"{accession}.xml.gz")
+
+    @staticmethod
+    def _name(accession: str, xml_url: str) -> str:
+        # entries written before this held the full URL, under any CIK folder
+        folder = f"/({accession}|{accession.replace('-', '')})/"
+        m = re.search(r"/edgar/data/\d+" + folder, xml_url)
+        return xml_url[m.end() :] if m else xml_url
+
+    def get(self, txt_path: str) -> Optional[Tuple[str, bytes]]:
+        accession = accession_of(txt_path)
+        p = self._path(accession)
+        try:
+            with gzip.open(p, "rb") as fh:
+                name, _, data = fh.read().partition(b"\n")
+            os.utime(p)
+        except (OSError, EOFError):
+            self.misses += 1
+            return None
+        if p in self._entries:
+            self._entries.move_to_end(p)
+        self.hits += 1
+        name = self._name(accession, name.decode("utf-8"))
+        return accession_url(txt_path) + "/" + name, data
+
+    def put(self, txt_path: str, xml_url: str, data: bytes) -> None:
+        accession = accession_of(txt_path)
+        p = self._path(accession)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        tmp = f"{p}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wb") as fh:
+            fh.write(self._name(accession, xml_url).encode("utf-8") + b"\n" + data)
+        os.replace(tmp, p)
+        size = os.path.getsize(p)
+        self._total += size - self._entries.pop(p, 0)
+        self._entries[p] = size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            p, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+def fetch_filing_xml(
+    txt_path: str,
+    session: requests.Session,
+    source: str = "probe",
+    stats: Optional["ProbeStats"] = None,
+    tries: int = 4,
+) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Resolve a filing's ownership XML. source="txt" downloads the full
+    submission once and extracts the XML from it; "probe" (also the
+    fallback) tries file names and the -index.htm links, in the order
+    `stats` has learned for the filer agent. `tries` per request covers
+    timeouts and network errors (the session retries 429/5xx itself).
+    """
+    if stats:
+        stats.filings += 1
+    host = host_of(EDGAR_ARCHIVES)
+    if source == "txt" and not breaker_tripped(host):
+        txt_url, dir_url = submission_urls(txt_path)
+        if stats:
+            stats.tried(ProbeStats.SUBMISSION)
+            stats.requests += 1
+        r = get_with_retries(txt_url, session, tries)
+        if r is not None and r.status_code == 200:
+            xml_url, xb = ownership_xml_from_submission(r.content, dir_url)
+            if xb:
+                if stats:
+                    stats.resolved(txt_path, ProbeStats.SUBMISSION, xml_url)
+                return xml_url, xb
+    index_url, _ = xml_candidates_from_txt(txt_path)
+    dir_url = accession_url(txt_path) + "/"
+    order = stats.order(txt_path) if stats else ProbeStats.DEFAULT_ORDER
+    for name in order:
+        if breaker_tripped(host):
+            break  # the rest would not be requested while the circuit is open
+        if name == ProbeStats.INDEX:
+            url, xb = find_xml_via_index(index_url, session, stats, tries)
+        else:
+            url = dir_url + name
+            if stats and stats.known_missing(url):
+                continue
+            xb = fetch_xml(url, session, stats, tries)
+        if stats:
+            stats.tried(name)
+        if xb:
+            if stats:
+                stats.resolved(txt_path, name, url)
+            return url, xb
+    return None, None
+
+
+# ---- Learned probe order / negative cache ----
+class ProbeStats:
+    """
+    Learns which XML file names resolve per filer agent (the accession's
+    10-digit prefix) so the likeliest candidate is tried first, and keeps a
+    persistent set of URLs that returned 404 so none is requested twice.
+    Names that embed digits (wf-form4_1234.xml) cannot be guessed, so for
+    those the agent's -index.htm route is credited instead.
+    """
+
+    INDEX = "-index.htm"
+    SUBMISSION = "submission.txt"
+    DEFAULT_ORDER = ["form4.xml", "primary_doc.xml", INDEX]
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.agents: Dict[str, Dict[str, int]] = {}
+        self.missing: set = set()
+        self.attempts: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.filings = 0
+        self.requests = 0
+        self._missing_fh = None
+        if root:
+            os.makedirs(root, exist_ok=True)
+            try:
+                with open(os.path.join(root, "agents.json"), encoding="utf-8") as fh:
+                    self.agents = json.load(fh)
+            except (OSError, ValueError):
+                pass
+            try:
+                with open(os.path.join(root, "missing.txt"), encoding="utf-8") as fh:
+                    self.missing = {line.strip() for line in fh if line.strip()}
+            except OSError:
+                pass
+            self._missing_fh = open(
+                os.path.join(root, "missing.txt"), "a", encoding="utf-8"
+            )
+
+    @staticmethod
+    def agent_of(txt_path: str) -> str:
+        return accession_of(txt_path).split("-", 1)[0]
+
+    @staticmethod
+    def pattern_of(url: str) -> str:
+        return re.sub(r"\d+", "#", url.rsplit("/", 1)[-1])
+
+    def order(self, txt_path: str) -> List[str]:
+        learned = self.agents.get(self.agent_of(txt_path), {})
+        names = list(dict.fromkeys(self.DEFAULT_ORDER + list(learned)))
+        # stable sort: unseen names keep the default order
+        return sorted(names, key=lambda n: -learned.get(n, 0))
+
+    def known_missing(self, url: str) -> bool:
+        return url in self.missing
+
+    def tried(self, name: str) -> None:
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+
+    def not_found(self, url: str) -> None:
+        if url in self.missing:
+            return
+        self.missing.add(url)
+        if self._missing_fh:
+            self._missing_fh.write(url + "\n")
+            self._missing_fh.flush()
+
+    def resolved(self, txt_path: str, name: str, xml_url: str) -> None:
+        self.hits[name] = self.hits.get(name, 0) + 1
+        if name == self.SUBMISSION:
+            return
+        if name == self.INDEX and "#" not in self.pattern_of(xml_url):
+            name = xml_url.rsplit("/", 1)[-1]  # concrete name: probe it directly
+        learned = self.agents.setdefault(self.agent_of(txt_path), {})
+        learned[name] = learned.get(name, 0) + 1
+
+    def report(self) -> str:
+        lines = [
+            f"Probe: {self.requests} requests for {self.filings} filings "
+            f"({self.requests / max(self.filings, 1):.2f}/filing)"
+        ]
+        for name, n in sorted(self.attempts.items(), key=lambda kv: -kv[1]):
+            h = self.hits.get(name, 0)
+            lines.append(f"  {name}: {h}/{n} hits ({100.0 * h / n:.0f}%)")
+        return "\n".join(lines)
+
+    def save(self) -> None:
+        if self._missing_fh:
+            self._missing_fh.close()
+            self._missing_fh = None
+        if not self.root:
+            return
+        path = os.path.join(self.root, "agents.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.agents, fh)
+        os.replace(tmp, path)
 
 
 # ---- Footnote price parsing ----
@@ -264,6 +1141,7 @@ def parse_schedule4_xml(xml_bytes: bytes) -> Tuple[dict, List[dict]]:
     xp = lambda p: root.xpath(p, namespaces=root.nsmap)
 
     header = {
+        "issuerCik": "".join(xp("string(//issuer/issuerCik)")).strip(),
         "issuerName": "".join(xp("string(//issuer/issuerName)")).strip(),
         "issuerTradingSymbol": "".join(
             xp("string(//issuer/issuerTradingSymbol)")
@@ -329,6 +1207,105 @@ def parse_schedule4_xml(xml_bytes: bytes) -> Tuple[dict, List[dict]]:
     return header, rows
 
 
+# compiled once; evaluated against each document / node
+XP_ISSUER_CIK = etree.XPath("string(//issuer/issuerCik)")
+XP_ISSUER_NAME = etree.XPath("string(//issuer/issuerName)")
+XP_ISSUER_SYMBOL = etree.XPath("string(//issuer/issuerTradingSymbol)")
+XP_PERIOD = etree.XPath("string(//periodOfReport)")
+XP_REMARKS = etree.XPath("string(//remarks)")
+XP_OWNERS = etree.XPath("//reportingOwner")
+XP_OWNER_NAME = etree.XPath("string(reportingOwnerId/rptOwnerName)")
+XP_OWNER_TEN = etree.XPath("string(reportingOwnerRelationship/isTenPercentOwner)")
+XP_TXS = etree.XPath("//nonDerivativeTable/nonDerivativeTransaction")
+XP_TX_CODE = etree.XPath("string(transactionCoding/transactionCode)")
+XP_TX_DATE = etree.XPath("string(transactionDate/value)")
+XP_TX_SHARES = etree.XPath("string(transactionAmounts/transactionShares/value)")
+XP_TX_PRICE = etree.XPath("string(transactionAmounts/transactionPricePerShare/value)")
+XP_TX_NOTE_IDS = etree.XPath(".//footnoteId/@id")
+
+
+def parse_form4_filtered(
+    xml_bytes: bytes,
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+) -> Tuple[dict, List[dict], int]:
+    """
+    parse_schedule4_xml + filter_transactions in one pass: returns the header,
+    the kept owner x transaction dicts (same keys and order) and the number of
+    owner x transaction pairs in the document. Rejects OTC issuers, then
+    owners, then transaction codes before reading anything else, and only
+    looks at footnotes/remarks for kept transactions without a price.
+    """
+    root = etree.fromstring(xml_bytes)
+    header = {
+        "issuerCik": XP_ISSUER_CIK(root).strip(),
+        "issuerName": XP_ISSUER_NAME(root).strip(),
+        "issuerTradingSymbol": XP_ISSUER_SYMBOL(root).strip(),
+        "periodOfReport": XP_PERIOD(root).strip(),
+    }
+    owners = XP_OWNERS(root)
+    tx_nodes = XP_TXS(root)
+    raw = len(owners) * len(tx_nodes)
+    if drop_otc and otc_symbol(header["issuerTradingSymbol"]):
+        return header, [], raw
+
+    kept_owners = []
+    for o in owners:
+        name = XP_OWNER_NAME(o).strip()
+        ten = XP_OWNER_TEN(o).strip().lower() == "true"
+        if tenpct_required and not ten:
+            continue
+        if likely_individual_name(name):
+            continue
+        kept_owners.append((name, ten))
+    if not kept_owners:
+        return header, [], raw
+
+    footnotes = remarks = None
+    rows = []
+    for tx in tx_nodes:
+        code = XP_TX_CODE(tx).strip()
+        if code not in allowed_codes:
+            continue
+        price = XP_TX_PRICE(tx).strip()
+        parsed_note = {
+            "price_avg_from_note": None,
+            "price_min_from_note": None,
+            "price_max_from_note": None,
+        }
+        if not price:
+            if footnotes is None:
+                footnotes = collect_footnotes(root)
+                remarks = XP_REMARKS(root).strip()
+            texts = [footnotes[fid] for fid in XP_TX_NOTE_IDS(tx) if fid in footnotes]
+            if remarks:
+                texts.append(remarks)
+            for txt in texts:
+                pn = parse_price_from_text(txt)
+                if (
+                    pn["price_avg_from_note"] is not None
+                    or pn["price_min_from_note"] is not None
+                ):
+                    parsed_note = pn
+                    break
+        tdate = XP_TX_DATE(tx).strip()
+        shares = XP_TX_SHARES(tx).strip()
+        for name, ten in kept_owners:
+            rows.append(
+                {
+                    "rptOwnerName": name,
+                    "isTenPercentOwner": ten,
+                    "transactionCode": code,
+                    "transactionDate": tdate,
+                    "transactionShares": shares,
+                    "transactionPricePerShare": price,
+                    **parsed_note,
+                }
+            )
+    return header, rows, raw
+
+
 # ---- Filters ----
 CORP_SUFFIX_RE = re.compile(
     r"\b(inc\.?|corporation|corp\.?|ltd\.?|plc|ag|nv|s\.a\.|gmbh|holdings?|group|co\.?)\b",
@@ -351,6 +1328,11 @@ def likely_individual_name(name: str) -> bool:
     return bool(INDIVIDUAL_NAME_RE.match(name)) and not likely_corporate_name(name)
 
 
+def otc_symbol(symbol: str) -> bool:
+    # missing, suffixed (e.g. ".PK") or over-long symbols are OTC/foreign listings
+    return not symbol or "." in symbol or len(symbol) > 6
+
+
 def filter_transactions(
     header: dict,
     txs: List[dict],
@@ -360,9 +1342,8 @@ def filter_transactions(
 ) -> List[dict]:
     out = []
     symbol = (header.get("issuerTradingSymbol") or "").strip()
-    if drop_otc:
-        if not symbol or "." in symbol or len(symbol) > 6:
-            return out
+    if drop_otc and otc_symbol(symbol):
+        return out
     for t in txs:
         if tenpct_required and not t["isTenPercentOwner"]:
             continue
@@ -376,66 +1357,111 @@ def filter_transactions(
     return out
 
 
-# central rate limiter (tokens per second)
-class RateLimiter:
-    def __init__(self, rps=2.0):
-        self.permit_interval = 1.0 / rps
-        self._next = time.monotonic()
-        self._lock = asyncio.Lock()
+# ---- Issuer exchange map ----
+LISTED_EXCHANGES = {"nyse", "nasdaq", "cboe"}
 
-    async def acquire(self):
-        async with self._lock:
-            now = time.monotonic()
-            if now < self._next:
-                await asyncio.sleep(self._next - now)
-            self._next = max(now, self._next) + self.permit_interval
 
+class IssuerMap:
+    """
+    CIK -> exchanges from SEC's company_tickers_exchange.json, kept at `path`
+    and refreshed at most once a day. A CIK is listed when any of its tickers
+    trades on a national exchange; OTC-only and unknown CIKs (shells,
+    delisted issuers, funds, people) are not. With drop_otc this replaces
+    the ticker-symbol guess and lets filings be dropped from the index
+    before any XML is requested.
+    """
 
-async def fetch_xml_httpx(client, url, rl: RateLimiter):
-    await rl.acquire()
-    r = await client.get(url, timeout=30)
-    if r.status_code == 200 and "xml" in r.headers.get("content-type", "").lower():
-        return r.content
-    return None
+    def __init__(self, exchanges: Dict[int, set]):
+        self.exchanges = exchanges
+        self.seen = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "IssuerMap":
+        data = json.loads(raw)
+        ci = data["fields"].index("cik")
+        ei = data["fields"].index("exchange")
+        exchanges: Dict[int, set] = {}
+        for row in data["data"]:
+            exchanges.setdefault(int(row[ci]), set()).add((row[ei] or "").lower())
+        return cls(exchanges)
+
+    @classmethod
+    def load(
+        cls,
+        session: requests.Session,
+        path: Optional[str] = None,
+        deadline: Optional["Deadline"] = None,
+    ) -> Optional["IssuerMap"]:
+        raw = None
+        if path and os.path.exists(path):
+            with open(path, "rb") as fh:
+                raw = fh.read()
+            if dt.date.fromtimestamp(os.path.getmtime(path)) == dt.date.today():
+                return cls.from_json(raw)
+        read_s = (deadline or Deadline()).timeout(60)
+        r = get_with_retries(
+            COMPANY_TICKERS_EXCHANGE, session, timeout=(min(5, read_s), read_s)
+        )
+        if r is not None and r.status_code == 200:
+            raw = r.content
+            if path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(raw)
+                os.replace(tmp, path)
+        elif raw:
+            print("[WARN] Could not refresh the issuer map; using yesterday's copy")
+        else:
+            print("[WARN] No issuer map; falling back to the ticker-symbol OTC check")
+            return None
+        return cls.from_json(raw)
 
+    def listed(self, cik: str) -> bool:
+        try:
+            exchanges = self.exchanges.get(int(cik), ())
+        except ValueError:
+            return False
+        return any(e in LISTED_EXCHANGES for e in exchanges)
+
+    def select(self, filings: List[FilingRef]) -> List[FilingRef]:
+        # keep a filing when any of its listings (see one_per_accession) has an
+        # exchange-listed CIK
+        keep = {accession_of(f.txt_path) for f in filings if self.listed(f.cik)}
+        out = [f for f in filings if accession_of(f.txt_path) in keep]
+        seen = len({accession_of(f.txt_path) for f in filings})
+        self.seen += seen
+        self.skipped += seen - len(keep)
+        return out
 
-async def find_xml_via_index_httpx(client, index_url, rl: RateLimiter):
-    await rl.acquire()
-    r = await client.get(index_url, timeout=30)
-    if r.status_code != 200:
-        return None, None
-    for href in re.findall(r'href="([^"]+\.xml)"', r.text, flags=re.I):
-        url = httpx.URL(index_url).join(href)
-        xb = await fetch_xml_httpx(client, str(url), rl)
-        if xb and b"<ownershipDocument" in xb:
-            return str(url), xb
-    return None, None
 
+# ---- CSV rows ----
+CSV_FIELDS = [
+    "buyer",
+    "issuer",
+    "ticker",
+    "trade_date",
+    "filing_date",
+    "price",
+    "price_min_from_note",
+    "price_max_from_note",
+    "shares",
+    "transaction_code",
+    "accession_url",
+    "xml_url",
+]
 
-async def process_filing_async(
-    client, rl, filing, allowed_codes, tenpct_required, drop_otc, print_passed
-):
-    index_url, xml_try = xml_candidates_from_txt(filing.txt_path)
-    xml_bytes, xml_url_final = None, None
-    # fast path
-    for cand in xml_try:
-        xb = await fetch_xml_httpx(client, cand, rl)
-        if xb:
-            xml_bytes, xml_url_final = xb, cand
-            break
-    if xml_bytes is None:
-        found_url, xb = await find_xml_via_index_httpx(client, index_url, rl)
-        if xb:
-            xml_bytes, xml_url_final = xb, found_url
-    if xml_bytes is None:
-        return 0, 0  # kept, raw
 
-    header, txs = parse_schedule4_xml(xml_bytes)
-    filtered = filter_transactions(
-        header, txs, allowed_codes, tenpct_required, drop_otc
-    )
-    kept = 0
-    # return CSV rows to be written by the main thread
+def accession_url(txt_path: str) -> str:
+    base_dir, name = txt_path.rsplit("/", 1)
+    return urljoin(EDGAR_ARCHIVES, base_dir + "/" + name.replace(".txt", ""))
+
+
+def filing_rows(
+    filing: FilingRef, header: dict, filtered: List[dict], xml_url: Optional[str]
+) -> List[dict]:
+    """One CSV row per kept transaction (shared by the sync and async engines)."""
     rows = []
     for t in filtered:
         price = t["transactionPricePerShare"] or (
@@ -453,71 +1479,523 @@ async def process_filing_async(
                 "price_max_from_note": t["price_max_from_note"] or "",
                 "shares": t["transactionShares"],
                 "transaction_code": t["transactionCode"],
-                "accession_url": urljoin(
-                    EDGAR_ARCHIVES,
-                    filing.txt_path.rsplit("/", 1)[0]
-                    + "/"
-                    + filing.txt_path.rsplit("/", 1)[1].replace(".txt", ""),
-                ),
-                "xml_url": xml_url_final or "",
+                "accession_url": accession_url(filing.txt_path),
+                "xml_url": xml_url or "",
             }
         )
-        kept += 1
-        if print_passed:
-            print(
-                f"PASS | {header.get('issuerTradingSymbol','')} {header.get('issuerName','')} <- {t['rptOwnerName']} [{t['transactionCode']}]"
+    return rows
+
+
+def filing_row_tuples(
+    xml_bytes: bytes,
+    filing: FilingRef,
+    xml_url: Optional[str],
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+) -> Tuple[List[tuple], int, str]:
+    """
+    Parse + filter + format one filing as CSV_FIELDS-ordered tuples, plus the
+    raw transaction count and the issuer CIK. Top-level and pickle-friendly
+    so the async engine can run it in a parse pool.
+    """
+    header, filtered, raw = parse_form4_filtered(
+        xml_bytes, allowed_codes, tenpct_required, drop_otc
+    )
+    rows = filing_rows(filing, header, filtered, xml_url)
+    return [tuple(r[k] for k in CSV_FIELDS) for r in rows], raw, header["issuerCik"]
+
+
+def make_parse_pool(kind: str, workers: int) -> Optional[Executor]:
+    workers = workers or os.cpu_count() or 1
+    if kind == "auto":
+        # one core: the pool only adds pickling/IPC to a ~60us parse
+        kind = "process" if workers > 1 else "inline"
+    if kind == "inline":
+        return None
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parse")
+
+
+# ---- Run ledger ----
+class BloomFilter:
+    """Bloom filter over strings; k bit positions from one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        n = max(capacity, 1)
+        self.capacity = n
+        self.bits = max(int(-n * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.k = max(round(self.bits / n * math.log(2)), 1)
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        d = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.k))
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self._array[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[p >> 3] >> (p & 7) & 1 for p in self._positions(key))
+
+
+class RunLedger:
+    """
+    Per-accession progress of one output, committed with the output's flushed
+    size; failed filings are the retry queue (RETRY_DELAYS_S, MAX_ATTEMPTS).
+    """
+
+    FETCHED = "fetched"
+    PARSED = "parsed"
+    WRITTEN = "written"
+    FAILED = "failed"
+    DEFERRED = "deferred"  # mark() only; stored as FAILED
+
+    RETRY_DELAYS_S = (15, 60, 300, 1800, 7200, 43200)
+    MAX_ATTEMPTS = len(RETRY_DELAYS_S) + 1  # the last delay leads to the last try
+
+    COLUMNS = (
+        "accession", "day", "status", "rows", "output", "updated",
+        "txt_path", "cik", "company", "form", "attempts", "next_at", "first_failed",
+    )  # fmt: skip
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS filings (
+            accession TEXT PRIMARY KEY, day TEXT, status TEXT,
+            rows INTEGER, output TEXT, updated REAL);
+        CREATE INDEX IF NOT EXISTS filings_output ON filings (output);
+        CREATE TABLE IF NOT EXISTS outputs (path TEXT PRIMARY KEY, size INTEGER);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(self.SCHEMA)
+        have = {r[1] for r in self.db.execute("PRAGMA table_info(filings)")}
+        for col in self.COLUMNS:
+            if col not in have:  # ledgers written before the retry queue
+                self.db.execute(f"ALTER TABLE filings ADD COLUMN {col}")
+        self.output = ""  # file new marks belong to; set by CsvOutput
+        self.skipped = 0
+        self.failed = 0
+        self.deferred = 0
+        self._pending: Dict[str, tuple] = {}  # accession -> COLUMNS[1:] values
+        self._written = 0
+        self._load_bloom()
+
+    def _load_bloom(self) -> None:
+        accs = [
+            a
+            for (a,) in self.db.execute(
+                "SELECT accession FROM filings WHERE status = ?", (self.WRITTEN,)
             )
-    return kept, len(txs), rows
-
-
-def process_date_parallel(
-    day,
-    filings,
-    writer,
-    allowed_codes,
-    tenpct_required,
-    drop_otc,
-    print_passed,
-    rps=2.0,
-    workers=6,
-):
-    kept_total = 0
-    raw_total = 0
-    rows_to_write = []
-
-    async def runner():
-        nonlocal kept_total, raw_total, rows_to_write
-        rl = RateLimiter(rps=rps)
-        limits = httpx.Limits(
-            max_keepalive_connections=workers, max_connections=workers
+        ]
+        accs += [a for a, p in self._pending.items() if p[1] == self.WRITTEN]
+        self._written = len(accs)
+        self._bloom = BloomFilter(max(2 * len(accs), 1 << 16))
+        for a in accs:
+            self._bloom.add(a)
+
+    def settings_changed(self, settings: str) -> bool:
+        row = self.db.execute(
+            "SELECT value FROM meta WHERE key = 'settings'"
+        ).fetchone()
+        return bool(row) and row[0] != settings
+
+    def check_settings(self, settings: str) -> None:
+        """Rows written under other filters do not count as done."""
+        if self.settings_changed(settings):
+            print("[WARN] Filters changed since the ledger was written; starting over")
+            self.db.execute("DELETE FROM filings")
+            self.db.execute("DELETE FROM outputs")
+            self._pending.clear()
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('settings', ?)", (settings,)
         )
-        async with httpx.AsyncClient(
-            http2=True, headers=HEADERS, limits=limits
-        ) as client:
-            tasks = [
-                process_filing_async(
-                    client,
-                    rl,
-                    f,
-                    allowed_codes,
-                    tenpct_required,
-                    drop_otc,
-                    print_passed,
-                )
-                for f in filings
-            ]
-            for coro in asyncio.as_completed(tasks):
-                kept, raw, rows = await coro
-                kept_total += kept
-                raw_total += raw
-                if rows:
-                    rows_to_write.extend(rows)
+        self.db.commit()
+        self._load_bloom()
+
+    def __contains__(self, accession: str) -> bool:
+        """True once the accession's rows are in the output."""
+        if accession not in self._bloom:
+            return False
+        if accession in self._pending:
+            return self._pending[accession][1] == self.WRITTEN
+        row = self.db.execute(
+            "SELECT status FROM filings WHERE accession = ?", (accession,)
+        ).fetchone()
+        return bool(row) and row[0] == self.WRITTEN
+
+    def unwritten(self, filings: List[FilingRef]) -> List[FilingRef]:
+        out = [f for f in filings if accession_of(f.txt_path) not in self]
+        self.skipped += len(filings) - len(out)
+        return out
 
-    asyncio.run(runner())
-    # single-writer flush
-    for row in rows_to_write:
-        writer.writerow(row)
-    return kept_total, raw_total
+    def mark(self, filing: FilingRef, status: str, rows: int = 0) -> None:
+        acc = accession_of(filing.txt_path)
+        attempts, next_at, first_failed = 0, None, None
+        if status in (self.FAILED, self.DEFERRED):
+            p = self._pending.get(acc)
+            if p is not None:
+                prev = (p[1], p[9], p[11])
+            else:
+                prev = self.db.execute(
+                    "SELECT status, attempts, first_failed FROM filings "
+                    "WHERE accession = ?",
+                    (acc,),
+                ).fetchone()
+            if prev and prev[0] == self.FAILED:
+                attempts, first_failed = prev[1] or 0, prev[2]
+            now = time.time()
+            if status == self.FAILED:
+                attempts += 1
+                first_failed = first_failed or now
+                self.failed += 1
+            else:
+                self.deferred += 1
+                status = self.FAILED
+            if attempts < self.MAX_ATTEMPTS:
+                delays = self.RETRY_DELAYS_S
+                next_at = now + delays[min(max(attempts, 1), len(delays)) - 1]
+        self._pending[acc] = (
+            filing.date_filed,
+            status,
+            rows,
+            self.output,
+            time.time(),
+            filing.txt_path,
+            filing.cik,
+            filing.company_name,
+            filing.schedule_type,
+            attempts,
+            next_at,
+            first_failed,
+        )
+        if status == self.WRITTEN:
+            self._bloom.add(acc)
+            self._written += 1
+            if self._written > self._bloom.capacity:
+                self._load_bloom()  # keep the false-positive rate down as it grows
+
+    def resume_size(self, path: str) -> Optional[int]:
+        """Committed size of `path` if its contents are still usable."""
+        row = self.db.execute(
+            "SELECT size FROM outputs WHERE path = ?", (path,)
+        ).fetchone()
+        if row and os.path.exists(path) and os.path.getsize(path) >= row[0]:
+            return row[0]
+        return None
+
+    def forget(self, output: str, path: str) -> None:
+        """`path` (the file for `output`) is being started from scratch."""
+        self.db.execute(
+            "DELETE FROM filings WHERE output = ? AND status != ?",
+            (output, self.FAILED),  # still queued for retry
+        )
+        self.db.execute("DELETE FROM outputs WHERE path = ?", (path,))
+        self.db.commit()
+        self._load_bloom()
+
+    def moved(self, old: str, new: str) -> None:
+        # a finished .part was renamed; later appends resume from its size
+        self.db.execute("DELETE FROM outputs WHERE path = ?", (new,))
+        self.db.execute("UPDATE outputs SET path = ? WHERE path = ?", (new, old))
+        self.db.commit()
+
+    def commit(self, path: str, size: int) -> None:
+        cols = ", ".join(self.COLUMNS)
+        marks = ", ".join("?" * len(self.COLUMNS))
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO filings ({cols}) VALUES ({marks})",
+            [(a, *p) for a, p in self._pending.items()],
+        )
+        self.db.execute("INSERT OR REPLACE INTO outputs VALUES (?, ?)", (path, size))
+        self.db.commit()
+        self._pending.clear()
+
+    # -- retry queue --
+    def _queued(self, can_append: Callable[[dt.date], bool]):
+        rows = self.db.execute(
+            "SELECT accession, day, next_at, txt_path, cik, company, form "
+            "FROM filings WHERE status = ? AND next_at IS NOT NULL "
+            "ORDER BY day, accession",
+            (self.FAILED,),
+        ).fetchall()
+        return [r for r in rows if can_append(dt.date.fromisoformat(r[1]))]
+
+    def retry_rounds(
+        self, can_append: Callable[[dt.date], bool], wait_s: float
+    ) -> Iterable[float]:
+        """
+        Seconds to sleep before each drain round, while some queued filing
+        whose output can still take rows comes due within wait_s.
+        """
+        deadline = time.time() + wait_s
+        while True:
+            due = min((r[2] for r in self._queued(can_append)), default=None)
+            if due is None or due > deadline:
+                return
+            yield max(due - time.time(), 0.0)
+
+    def due_by_day(
+        self, can_append: Callable[[dt.date], bool]
+    ) -> Dict[dt.date, List[FilingRef]]:
+        """
+        Queued filings that are due, by filing date. They are rescheduled
+        as if this attempt fails, so one that the drain skips is not picked
+        again straight away; mark() overrides that either way.
+        """
+        now = time.time()
+        out: Dict[dt.date, List[FilingRef]] = {}
+        for acc, day, next_at, txt_path, cik, company, form in self._queued(can_append):
+            if next_at > now:
+                continue
+            out.setdefault(dt.date.fromisoformat(day), []).append(
+                FilingRef(cik, company, form, day, txt_path)
+            )
+            self.db.execute(
+                "UPDATE filings SET next_at = ? WHERE accession = ?",
+                (now + self.RETRY_DELAYS_S[0], acc),
+            )
+        self.db.commit()
+        return out
+
+    def given_up(self) -> List[tuple]:
+        return self.db.execute(
+            "SELECT accession, day, attempts, first_failed, txt_path FROM filings "
+            "WHERE status = ? AND next_at IS NULL ORDER BY day, accession",
+            (self.FAILED,),
+        ).fetchall()
+
+    def write_failed(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            w.writerow(["accession", "filing_date", "attempts", "first_failed", "accession_url"])
+            for acc, day, attempts, first, txt_path in self.given_up():
+                first = dt.datetime.fromtimestamp(first).isoformat(timespec="seconds")
+                w.writerow([acc, day, attempts, first, accession_url(txt_path)])
+
+    def report(self) -> str:
+        return (
+            f"Ledger: skipped {self.skipped} filings already written; "
+            f"{self.failed} failed this run, {self.deferred} deferred while "
+            "the circuit breaker was open"
+        )
+
+    def retry_report(self, limit: int = 20) -> str:
+        waiting = self.db.execute(
+            "SELECT COUNT(*), MIN(next_at) FROM filings "
+            "WHERE status = ? AND next_at IS NOT NULL",
+            (self.FAILED,),
+        ).fetchone()
+        dead = self.given_up()
+        lines = [f"Retry queue: {waiting[0]} filings waiting"]
+        if waiting[0]:
+            lines[0] += f" (next due in {max(waiting[1] - time.time(), 0) / 60:.0f} min)"
+        lines[0] += f", {len(dead)} given up after {self.MAX_ATTEMPTS} attempts"
+        for acc, day, attempts, _, txt_path in dead[:limit]:
+            lines.append(f"  {day} {acc} {accession_url(txt_path)}")
+        if len(dead) > limit:
+            lines.append(f"  ... and {len(dead) - limit} more (--failed_csv)")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self.db.close()
+
+
+# ---- CSV output ----
+class CsvOutput:
+    """
+    One CSV for the whole run, or (with out_dir) one CSV per filing date at
+    out_dir/YYYY/form4_YYYY-MM-DD.csv. Day files are written to .part and
+    renamed once the day is complete, so an interrupted backfill resumes at
+    the first day without a finished file. With a ledger, each flush commits
+    the filings written so far; a file the ledger knows is cut back to its
+    last commit and appended to instead of being rewritten.
+    """
+
+    def __init__(
+        self,
+        fieldnames: List[str],
+        csv_path: Optional[str] = None,
+        out_dir: Optional[str] = None,
+        ledger: Optional[RunLedger] = None,
+    ):
+        self.fieldnames = fieldnames
+        self.out_dir = out_dir
+        self.ledger = ledger
+        self._fh = None
+        self._writer = None
+        self._day_fh = None
+        self._path = None  # file the open handle writes to
+        if csv_path:
+            self._fh, self._writer = self._open(csv_path, csv_path)
+
+    def _open(self, path: str, output: str, append: bool = False):
+        size = self.ledger.resume_size(path) if self.ledger else None
+        if size is not None or (append and os.path.exists(path)):
+            if size is not None:
+                with open(path, "r+b") as fh:
+                    fh.truncate(size)  # drop rows written after the last commit
+            fh = open(path, "a", newline="", encoding="utf-8")
+            w = csv.DictWriter(fh, fieldnames=self.fieldnames)
+        else:
+            if self.ledger:
+                self.ledger.forget(output, path)
+            fh = open(path, "w", newline="", encoding="utf-8")
+            w = csv.DictWriter(fh, fieldnames=self.fieldnames)
+            w.writeheader()
+        if self.ledger:
+            self.ledger.output = output
+        self._path = path
+        return fh, w
+
+    def day_path(self, day: dt.date) -> str:
+        return os.path.join(self.out_dir, f"{day:%Y}", f"form4_{day.isoformat()}.csv")
+
+    def done(self, day: dt.date) -> bool:
+        return bool(self.out_dir) and os.path.exists(self.day_path(day))
+
+    def can_append(self, day: dt.date) -> bool:
+        # a day still to be (re)written picks up its queued filings itself
+        return not self.out_dir or self.done(day)
+
+    @contextmanager
+    def day(self, day: dt.date):
+        if not self.out_dir:
+            yield self._writer
+            return
+        path = self.day_path(day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = path + ".part"
+        fh, w = self._open(part, path)
+        with fh:
+            self._day_fh = fh
+            try:
+                yield w
+                self.flush()
+            finally:
+                self._day_fh = None
+        os.replace(part, path)
+        if self.ledger:
+            self.ledger.moved(part, path)
+
+    @contextmanager
+    def append(self, day: dt.date):
+        """Late rows (retry-queue drains) for a day that is already written."""
+        if not self.out_dir:
+            yield self._writer
+            self.flush()
+            return
+        path = self.day_path(day)
+        fh, w = self._open(path, path, append=True)
+        with fh:
+            self._day_fh = fh
+            try:
+                yield w
+                self.flush()
+            finally:
+                self._day_fh = None
+
+    @contextmanager
+    def live(self, day: dt.date):
+        """
+        Rows for a day still being filed (--watch). They go to the day's .part
+        file, which the run over that day's index later finishes (adding only
+        what the ledger lacks), or are appended once the day is written.
+        """
+        if not self.out_dir or self.done(day):
+            with self.append(day) as w:
+                yield w
+            return
+        path = self.day_path(day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = path + ".part"
+        fh, w = self._open(part, path, append=True)
+        with fh:
+            self._day_fh = fh
+            try:
+                yield w
+                self.flush()
+            finally:
+                self._day_fh = None
+
+    def flush(self) -> None:
+        # rows written so far reach the disk even if the run dies mid-day
+        fh = self._day_fh or self._fh
+        if fh:
+            fh.flush()
+            if self.ledger:
+                self.ledger.commit(self._path, os.fstat(fh.fileno()).st_size)
+
+    def close(self) -> None:
+        # no final commit: rows after the last flush may be a partial filing
+        if self._fh:
+            self._fh.close()
+
+
+# ---- Run deadline ----
+class IndexUnavailable(Exception):
+    """A day's index is not published yet or could not be fetched."""
+
+
+class DeadlineReached(Exception):
+    """Raised by Deadline once the run's time budget is spent."""
+
+
+class Deadline:
+    """
+    --deadline: past `at` (monotonic) no further filing is started, and the
+    run unwinds like an interrupted one: committed rows stay, a day file
+    stays .part, and the ledger hands the unwritten filings to the next run.
+    The async engine also cancels the filings in flight.
+    """
+
+    def __init__(self, minutes: Optional[float] = None):
+        self.at = time.monotonic() + minutes * 60 if minutes else None
+        self.reached = False
+
+    def left(self) -> float:
+        return math.inf if self.at is None else self.at - time.monotonic()
+
+    def _stop(self) -> DeadlineReached:
+        self.reached = True
+        return DeadlineReached()
+
+    def check(self) -> None:
+        if self.left() <= 0:
+            raise self._stop()
+
+    def timeout(self, seconds: float = 30) -> float:
+        """Timeout for one request: `seconds`, or what is left if less."""
+        self.check()
+        return min(seconds, self.left())
+
+    def pause(self, breaker: Optional[CircuitBreaker]) -> None:
+        """Sync dispatch: wait out an open breaker unless that outlasts the run."""
+        self.check()
+        if breaker is not None and not breaker.wait(self.at):
+            raise self._stop()
+
+    def within(self, seconds: float) -> "Deadline":
+        """A deadline `seconds` from now, or at this one if that comes first."""
+        sub = Deadline()
+        sub.at = time.monotonic() + min(seconds, self.left())
+        return sub
+
+    async def bound(self, aw):
+        if self.at is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, max(self.left(), 0.0))
+        except asyncio.TimeoutError:
+            raise self._stop() from None
 
 
 # ---- Per-day processing ----
@@ -525,41 +2003,69 @@ def process_date(
     day: dt.date,
     writer: csv.DictWriter,
     session: requests.Session,
+    *,
     sleep_s: float,
     allowed_codes: set,
     tenpct_required: bool,
     drop_otc: bool,
     print_passed: bool,
+    cache: Optional[XmlCache] = None,
+    index_store: Optional[IndexStore] = None,
+    index_mode: str = "full",
+    filings: Optional[List[FilingRef]] = None,
+    xml_source: str = "probe",
+    probe_stats: Optional[ProbeStats] = None,
+    issuer_map: Optional[IssuerMap] = None,
+    flush: Optional[Callable[[], None]] = None,
+    ledger: Optional[RunLedger] = None,
+    tries: int = 4,
+    filing_session: Optional[requests.Session] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None,
 ) -> Tuple[int, int]:
-    idx_text = fetch_daily_schedule_index(day, session)
-    if not idx_text:
-        return (0, 0)
-
-    filings = parse_schedule_index(idx_text)
+    if filings is None:
+        if deadline:
+            deadline.pause(breaker)
+        idx_text = fetch_daily_schedule_index(
+            day, session, index_store, index_mode, deadline
+        )
+        if idx_text is None:
+            raise IndexUnavailable(day)  # unlike an index without Form 4 rows
+        filings = parse_schedule_index(idx_text)
+    if issuer_map:
+        filings = issuer_map.select(filings)
+    filings = one_per_accession(filings)
+    if ledger:
+        filings = ledger.unwritten(filings)
     kept = 0
     raw = 0
 
     for f in filings:
-        index_url, xml_try = xml_candidates_from_txt(f.txt_path)
-
-        xml_bytes = None
-        xml_url_final = None
-        for cand in xml_try:
-            xb = fetch_xml(cand, session)
-            if xb:
-                xml_bytes = xb
-                xml_url_final = cand
-                break
-        if xml_bytes is None:
-            found = find_xml_via_index(index_url, session)
-            if found:
-                xb = fetch_xml(found, session)
-                if xb:
-                    xml_bytes = xb
-                    xml_url_final = found
-        if xml_bytes is None:
-            time.sleep(sleep_s)
+        hit = cache.get(f.txt_path) if cache else None
+        if not hit and ledger and breaker and breaker.deferring():
+            ledger.mark(f, RunLedger.DEFERRED)  # SEC still down: retry later
+            if flush:
+                flush()
             continue
+        if deadline:
+            deadline.pause(None if hit else breaker)
+        if hit:
+            xml_url_final, xml_bytes = hit
+        else:
+            xml_url_final, xml_bytes = fetch_filing_xml(
+                f.txt_path, filing_session or session, xml_source, probe_stats, tries
+            )
+            if xml_bytes is None:
+                if ledger:
+                    ledger.mark(f, RunLedger.FAILED)  # queued for a later retry
+                if flush:
+                    flush()
+                time.sleep(sleep_s)
+                continue
+            if cache:
+                cache.put(f.txt_path, xml_url_final, xml_bytes)
+        if ledger:
+            ledger.mark(f, RunLedger.FETCHED)
 
         header, txs = parse_schedule4_xml(xml_bytes)
         for t in txs:
@@ -568,233 +2074,783 @@ def process_date(
             )
         raw += len(txs)
         filtered = filter_transactions(
-            header, txs, allowed_codes, tenpct_required, drop_otc
+            header, txs, allowed_codes, tenpct_required, drop_otc and not issuer_map
         )
-        for t in filtered:
-            price = t["transactionPricePerShare"] or (
-                t["price_avg_from_note"] if t["price_avg_from_note"] is not None else ""
-            )
-            writer.writerow(
-                {
-                    "buyer": t["rptOwnerName"],
-                    "issuer": header.get("issuerName", ""),
-                    "ticker": header.get("issuerTradingSymbol", ""),
-                    "trade_date": t["transactionDate"]
-                    or header.get("periodOfReport", ""),
-                    "filing_date": f.date_filed,
-                    "price": price,
-                    "price_min_from_note": t["price_min_from_note"] or "",
-                    "price_max_from_note": t["price_max_from_note"] or "",
-                    "shares": t["transactionShares"],
-                    "transaction_code": t["transactionCode"],
-                    "accession_url": urljoin(
-                        EDGAR_ARCHIVES,
-                        f.txt_path.rsplit("/", 1)[0]
-                        + "/"
-                        + f.txt_path.rsplit("/", 1)[1].replace(".txt", ""),
-                    ),
-                    "xml_url": xml_url_final or "",
-                }
-            )
+        if issuer_map and not issuer_map.listed(header["issuerCik"]):
+            filtered = []
+        rows = filing_rows(f, header, filtered, xml_url_final)
+        for t, row in zip(filtered, rows):
+            writer.writerow(row)
             kept += 1
             if print_passed:
                 # concise live feedback per kept row
                 print(
-                    f"PASS {day} | {header.get('issuerTradingSymbol','')} {header.get('issuerName','')} <- {t['rptOwnerName']} [{t['transactionCode']}] {t['transactionDate'] or header.get('periodOfReport','')}"
+                    f"PASS {day} | {row['ticker']} {row['issuer']} <- {t['rptOwnerName']} [{t['transactionCode']}] {row['trade_date']}"
                 )
-        time.sleep(sleep_s)
+        if ledger:
+            ledger.mark(f, RunLedger.WRITTEN, len(rows))
+        if flush:
+            flush()
+        if not hit:
+            time.sleep(sleep_s)
     return (kept, raw)
 
 
-def process_date_async(
-    day: dt.date,
-    writer: csv.DictWriter,
+# ---- Watch mode ----
+class AcceptanceLag:
+    """Seconds from SEC acceptance to a filing's rows being written (--watch)."""
+
+    SAMPLES = 2048
+
+    def __init__(self):
+        self.samples: deque = deque(maxlen=self.SAMPLES)
+        self.filings = 0
+
+    def add(self, accepted: float) -> None:
+        self.filings += 1
+        self.samples.append(max(time.time() - accepted, 0.0))
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "no rows yet"
+        lags = sorted(self.samples)
+        p50, p95 = (lags[min(int(q * len(lags)), len(lags) - 1)] for q in (0.5, 0.95))
+        return f"p50 {p50:.0f}s p95 {p95:.0f}s max {lags[-1]:.0f}s"
+
+    def report(self) -> str:
+        return f"Acceptance to row: {self.filings} filings with rows, {self.summary()}"
+
+
+def watch_current_filings(
+    feed: CurrentFeed,
+    output: CsvOutput,
     session: requests.Session,
+    filing_session: requests.Session,
+    *,
+    poll_s: float,
     sleep_s: float,
     allowed_codes: set,
     tenpct_required: bool,
     drop_otc: bool,
     print_passed: bool,
+    lag: AcceptanceLag,
+    cache: Optional[XmlCache] = None,
+    xml_source: str = "probe",
+    probe_stats: Optional[ProbeStats] = None,
+    issuer_map: Optional[IssuerMap] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None,
 ) -> Tuple[int, int]:
     """
-    Parallel, rate-limited processing for a single day with live per-row prints.
-    Uses HTTP/2 + connection reuse and a single printer coroutine so output streams continuously.
-    """
-
-    idx_text = fetch_daily_schedule_index(day, session)
-    if not idx_text:
-        return (0, 0)
-    filings = parse_schedule_index(idx_text)
-    if not filings:
-        return (0, 0)
-
-    # ---- helpers ----
-    class RateLimiter:
-        def __init__(self, rps: float = 2.0):
-            self.permit_interval = 1.0 / max(rps, 0.1)
-            self._next = time.monotonic()
-            self._lock = asyncio.Lock()
-
-        async def acquire(self):
-            async with self._lock:
-                now = time.monotonic()
-                if now < self._next:
-                    await asyncio.sleep(self._next - now)
-                self._next = max(now, self._next) + self.permit_interval
-
-    async def fetch_xml_httpx(client: httpx.AsyncClient, url: str, rl: RateLimiter):
-        await rl.acquire()
-        r = await client.get(url, timeout=30)
-        if r.status_code == 200 and "xml" in r.headers.get("content-type", "").lower():
-            return r.content
-        return None
+    Poll the current-filings feed every `poll_s` seconds and push each new
+    Form 4 through process_date on its own, appending its rows as soon as
+    it is parsed. Filings that fail go to the ledger's retry queue and are
+    retried between polls. Runs until Ctrl-C or the deadline.
+    """
+    deadline = deadline or Deadline()
+    ledger = output.ledger
+    live: set = set()  # days written here; their queued filings are ours to retry
+    kept_total = raw_total = 0
+
+    def run(day: dt.date, f: FilingRef, tries: int) -> Tuple[int, int]:
+        live.add(day)
+        with output.live(day) as w:
+            kept, raw = process_date(
+                day,
+                w,
+                session,
+                sleep_s=0.0,
+                allowed_codes=allowed_codes,
+                tenpct_required=tenpct_required,
+                drop_otc=drop_otc,
+                print_passed=print_passed,
+                cache=cache,
+                filings=[f],
+                xml_source=xml_source,
+                probe_stats=probe_stats,
+                issuer_map=issuer_map,
+                flush=output.flush,
+                ledger=ledger,
+                tries=tries,
+                filing_session=filing_session,
+                breaker=breaker,
+                deadline=deadline,
+            )
+        accepted = feed.seen.get(accession_of(f.txt_path))
+        if kept and accepted is not None:
+            lag.add(accepted)
+        time.sleep(sleep_s)
+        return kept, raw
 
-    async def find_xml_via_index_httpx(
-        client: httpx.AsyncClient, index_url: str, rl: RateLimiter
+    try:
+        while True:
+            started = time.monotonic()
+            deadline.pause(breaker)
+            new = feed.poll(deadline)
+            kept_before = kept_total
+            for f, _ in new:
+                kept, raw = run(dt.date.fromisoformat(f.date_filed), f, FIRST_PASS_TRIES)
+                kept_total += kept
+                raw_total += raw
+            retried = 0
+            if ledger:
+                due = ledger.due_by_day(lambda d: d in live or output.can_append(d))
+                for day, filings in due.items():
+                    for f in filings:
+                        kept, raw = run(day, f, 4)
+                        kept_total += kept
+                        raw_total += raw
+                        retried += 1
+            if new or retried:
+                print(
+                    f"{dt.datetime.now():%H:%M:%S} {len(new)} new filings"
+                    + (f", {retried} retried" if retried else "")
+                    + f", kept {kept_total - kept_before}; "
+                    f"acceptance to row {lag.summary()}",
+                    flush=True,
+                )
+            wait = poll_s - (time.monotonic() - started)
+            time.sleep(max(min(wait, deadline.left()), 0.0))
+    except (KeyboardInterrupt, DeadlineReached):
+        print("Stopped watching.")
+    return kept_total, raw_total
+
+
+# ---- Head-of-document screening ----
+class HeadScreen:
+    """
+    --head_screen: decide from the first KB of a filing whether the filters
+    can still keep it, so rejected filings are not downloaded in full. This
+    holds the run-wide filter settings and byte counts; doc() gives the
+    per-download state; screened_get streams the body into it.
+    """
+
+    def __init__(
+        self,
+        allowed_codes: set,
+        tenpct_required: bool,
+        drop_otc: bool,
+        issuer_map: Optional[IssuerMap] = None,
     ):
-        await rl.acquire()
-        r = await client.get(index_url, timeout=30)
-        if r.status_code != 200:
-            return None, None
-        for href in re.findall(r'href="([^"]+\.xml)"', r.text, flags=re.I):
-            url = str(httpx.URL(index_url).join(href))
-            xb = await fetch_xml_httpx(client, url, rl)
-            if xb and b"<ownershipDocument" in xb:
-                return url, xb
-        return None, None
+        self.allowed_codes = allowed_codes
+        self.tenpct_required = tenpct_required
+        self.drop_otc = drop_otc
+        self.issuer_map = issuer_map
+        self.filings = 0
+        self.rejected = 0
+        self.bytes_read = 0
+        self.bytes_skipped = 0
+
+    def doc(self) -> "HeadDoc":
+        self.filings += 1
+        return HeadDoc(self)
+
+    def report(self) -> str:
+        return (
+            f"Head screen: rejected {self.rejected} of {self.filings} filings early; "
+            f"read {self.bytes_read // 1024} KB, skipped {self.bytes_skipped // 1024} KB"
+        )
+
+
+class HeadDoc:
+    """
+    One download's screening state: verdict is True once no row can be kept,
+    False once the filters surely pass, None while undecided.
+    """
 
-    async def process_filing_async(
-        client: httpx.AsyncClient,
-        rl: RateLimiter,
-        f: FilingRef,
-        q: "asyncio.Queue[str]",
+    AFTER_OWNERS = {"nonDerivativeTable", "derivativeTable", "footnotes", "remarks"}
+    END = b"</ownershipDocument>"
+
+    def __init__(self, screen: HeadScreen):
+        self.screen = screen
+        self.reset()
+
+    def reset(self) -> None:
+        self.verdict: Optional[bool] = None
+        self._pending = b""
+        self._parser = None
+        self._cik = self._symbol = ""
+        self._issuer_done = not self.screen.drop_otc
+        self._owners = 0
+        self._owners_done = False
+        self._in_table = False
+        self._code_ok = False
+
+    @property
+    def rejected(self) -> bool:
+        return self.verdict is True
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        if self.verdict is not None:
+            return self.verdict
+        if self._parser is None:
+            self._pending += chunk
+            i = self._pending.find(b"<ownershipDocument")
+            if i < 0:
+                return None
+            chunk, self._pending = self._pending[i:], b""
+            self._parser = etree.XMLPullParser(events=("start", "end"))
+        end = chunk.find(self.END)
+        if end >= 0:
+            chunk = chunk[: end + len(self.END)]  # ignore the .txt wrapper after it
+        try:
+            self._parser.feed(chunk)
+            for event, el in self._parser.read_events():
+                self._event(event, el)
+                if self.verdict is not None:
+                    break
+        except etree.XMLSyntaxError:
+            self.verdict = False  # download it all; the full parse decides
+        return self.verdict
+
+    def finish(self, read: int, total: int) -> None:
+        self.screen.bytes_read += read
+        if self.rejected:
+            self.screen.rejected += 1
+            self.screen.bytes_skipped += max(total - read, 0)
+
+    def _event(self, event: str, el) -> None:
+        tag = el.tag
+        if event == "start":
+            if tag in self.AFTER_OWNERS:
+                self._all_owners()
+            if tag == "nonDerivativeTable":
+                self._in_table = True
+            return
+        if tag == "issuerCik":
+            self._cik = (el.text or "").strip()
+        elif tag == "issuerTradingSymbol":
+            self._symbol = (el.text or "").strip()
+        elif tag == "issuer":
+            self._check_issuer()
+        elif tag == "reportingOwner":
+            name = (el.findtext("reportingOwnerId/rptOwnerName") or "").strip()
+            ten = (
+                el.findtext("reportingOwnerRelationship/isTenPercentOwner") or ""
+            ).strip().lower() == "true"
+            eligible = ten or not self.screen.tenpct_required
+            if eligible and not likely_individual_name(name):
+                self._owners += 1
+        elif tag == "transactionCode" and self._in_table:
+            if (el.text or "").strip() in self.screen.allowed_codes:
+                self._code_ok = True
+        elif tag == "nonDerivativeTable":
+            self._in_table = False
+            self._all_codes()  # codes only rule a filing out once all are read
+        elif tag == "ownershipDocument":
+            self._check_issuer()
+            self._all_owners()
+            self._all_codes()
+        if self.verdict is None and self._issuer_done and self._owners_done:
+            if self._code_ok:
+                self.verdict = False
+
+    def _check_issuer(self) -> None:
+        if self._issuer_done:
+            return
+        self._issuer_done = True
+        s = self.screen
+        if s.issuer_map:
+            otc = not s.issuer_map.listed(self._cik)
+        else:
+            otc = otc_symbol(self._symbol)
+        if otc:
+            self.verdict = True
+
+    def _all_owners(self) -> None:
+        if not self._owners_done:
+            self._owners_done = True
+            if self._owners == 0:
+                self.verdict = True
+
+    def _all_codes(self) -> None:
+        if not self._code_ok:
+            self.verdict = True
+
+
+# ---- Async engine ----
+REORDER_WINDOW = 4  # finished filings buffered per worker while an earlier one is slow
+# tries per request in the main pass (both engines); failures go to the retry
+# queue instead of holding up the day, and the drain retries in full
+FIRST_PASS_TRIES = 2
+
+
+async def fetch_xml_httpx(
+    client: httpx.AsyncClient,
+    url: str,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    stats: Optional[ProbeStats] = None,
+    screen: Optional[HeadDoc] = None,
+) -> Optional[bytes]:
+    if breaker_tripped(host_of(url)):
+        return None  # would not be requested; not a try either
+    if stats:
+        if stats.known_missing(url):
+            return None
+        stats.requests += 1
+    r = await get_httpx(client, url, rl, retry, screen=screen)
+    if screen and screen.rejected:
+        return None
+    if r is not None and r.status_code == 404 and stats:
+        stats.not_found(url)
+    if (
+        r is not None
+        and r.status_code == 200
+        and "xml" in r.headers.get("content-type", "").lower()
     ):
-        index_url, xml_try = xml_candidates_from_txt(f.txt_path)
+        return r.content
+    return None
 
-        xml_bytes = None
-        xml_url_final = None
-        for cand in xml_try:
-            xb = await fetch_xml_httpx(client, cand, rl)
-            if xb:
-                xml_bytes, xml_url_final = xb, cand
-                break
 
-        if xml_bytes is None:
-            found_url, xb = await find_xml_via_index_httpx(client, index_url, rl)
+async def find_xml_via_index_httpx(
+    client: httpx.AsyncClient,
+    index_url: str,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    stats: Optional[ProbeStats] = None,
+) -> Tuple[Optional[str], Optional[bytes]]:
+    if stats:
+        stats.requests += 1
+    r = await get_httpx(client, index_url, rl, retry)
+    if r is None or r.status_code != 200:
+        return None, None
+    for href in re.findall(r'href="([^"]+\.xml)"', r.text, flags=re.I):
+        url = urljoin(index_url, href)
+        xb = await fetch_xml_httpx(client, url, rl, retry, stats)
+        if xb and b"<ownershipDocument" in xb:
+            return url, xb
+    return None, None
+
+
+async def fetch_filing_xml_httpx(
+    client: httpx.AsyncClient,
+    txt_path: str,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    source: str = "probe",
+    stats: Optional[ProbeStats] = None,
+    screen: Optional[HeadDoc] = None,
+) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    (xml_url, xml bytes) for one filing. With `screen`, a download it
+    rejects ends the search with (None, None) and screen.rejected set.
+    """
+    if stats:
+        stats.filings += 1
+    host = host_of(EDGAR_ARCHIVES)
+    if source == "txt" and not breaker_tripped(host):
+        txt_url, dir_url = submission_urls(txt_path)
+        if stats:
+            stats.tried(ProbeStats.SUBMISSION)
+            stats.requests += 1
+        r = await get_httpx(client, txt_url, rl, retry, screen=screen)
+        if screen and screen.rejected:
+            return None, None
+        if r is not None and r.status_code == 200:
+            xml_url, xb = ownership_xml_from_submission(r.content, dir_url)
             if xb:
-                xml_bytes, xml_url_final = xb, found_url
+                if stats:
+                    stats.resolved(txt_path, ProbeStats.SUBMISSION, xml_url)
+                return xml_url, xb
+    index_url, _ = xml_candidates_from_txt(txt_path)
+    dir_url = accession_url(txt_path) + "/"
+    order = stats.order(txt_path) if stats else ProbeStats.DEFAULT_ORDER
+    for name in order:
+        if breaker_tripped(host):
+            break  # the rest would not be requested while the circuit is open
+        if name == ProbeStats.INDEX:
+            url, xb = await find_xml_via_index_httpx(client, index_url, rl, retry, stats)
+        else:
+            url = dir_url + name
+            if stats and stats.known_missing(url):
+                continue
+            xb = await fetch_xml_httpx(client, url, rl, retry, stats, screen)
+            if screen and screen.rejected:
+                return None, None
+        if stats:
+            stats.tried(name)
+        if xb:
+            if stats:
+                stats.resolved(txt_path, name, url)
+            return url, xb
+    return None, None
 
-        if xml_bytes is None:
-            return 0, 0, []  # kept, raw, rows
 
-        header, txs = parse_schedule4_xml(xml_bytes)
-        raw = len(txs)
-        filtered = filter_transactions(
-            header, txs, allowed_codes, tenpct_required, drop_otc
+async def process_filing_async(
+    client: httpx.AsyncClient,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    day: dt.date,
+    filing: FilingRef,
+    *,
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+    print_passed: bool,
+    cache: Optional[XmlCache] = None,
+    xml_source: str = "probe",
+    probe_stats: Optional[ProbeStats] = None,
+    parse_pool: Optional[Executor] = None,
+    issuer_map: Optional[IssuerMap] = None,
+    head_screen: Optional[HeadScreen] = None,
+    ledger: Optional[RunLedger] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Optional[Tuple[int, int, Optional[List[dict]]]]:
+    """
+    (kept, raw, rows); rows is None when the filing could not be fetched.
+    None when it was not tried because the breaker stayed open (with a
+    ledger to queue it for retry).
+    """
+    hit = cache.get(filing.txt_path) if cache else None
+    if hit:
+        xml_url_final, xml_bytes = hit
+    else:
+        # dispatch pauses while SEC is failing, and gives up once a probe has
+        # failed too, rather than wait out each doubled cooldown in turn
+        if breaker and not await breaker.acquire(defer=ledger is not None):
+            return None
+        doc = head_screen.doc() if head_screen else None
+        xml_url_final, xml_bytes = await fetch_filing_xml_httpx(
+            client, filing.txt_path, rl, retry, xml_source, probe_stats, doc
         )
-
-        rows = []
-        kept = 0
-        acc_base = urljoin(
-            EDGAR_ARCHIVES,
-            f.txt_path.rsplit("/", 1)[0]
-            + "/"
-            + f.txt_path.rsplit("/", 1)[1].replace(".txt", ""),
+        if xml_bytes is None:
+            # screened out is a finished filing with no rows, not a failure
+            return 0, 0, ([] if doc and doc.rejected else None)
+        if cache:
+            cache.put(filing.txt_path, xml_url_final, xml_bytes)
+    if ledger:
+        ledger.mark(filing, RunLedger.FETCHED)
+
+    symbol_otc = drop_otc and issuer_map is None
+    args = (xml_bytes, filing, xml_url_final, allowed_codes, tenpct_required, symbol_otc)
+    if parse_pool is None:
+        tuples, raw, issuer_cik = filing_row_tuples(*args)
+    else:
+        loop = asyncio.get_running_loop()
+        tuples, raw, issuer_cik = await loop.run_in_executor(
+            parse_pool, filing_row_tuples, *args
         )
-        for t in filtered:
-            price = t["transactionPricePerShare"] or (
-                t["price_avg_from_note"] if t["price_avg_from_note"] is not None else ""
+    if issuer_map and not issuer_map.listed(issuer_cik):
+        tuples = []
+    if ledger:
+        ledger.mark(filing, RunLedger.PARSED)
+    rows = [dict(zip(CSV_FIELDS, t)) for t in tuples]
+    if print_passed:
+        for row in rows:
+            print(
+                f"PASS {day} | {row['ticker']} {row['issuer']} <- {row['buyer']} [{row['transaction_code']}] {row['trade_date']}",
+                flush=True,
             )
-            row = {
-                "buyer": t["rptOwnerName"],
-                "issuer": header.get("issuerName", ""),
-                "ticker": header.get("issuerTradingSymbol", ""),
-                "trade_date": t["transactionDate"] or header.get("periodOfReport", ""),
-                "filing_date": f.date_filed,
-                "price": price,
-                "price_min_from_note": t.get("price_min_from_note") or "",
-                "price_max_from_note": t.get("price_max_from_note") or "",
-                "shares": t["transactionShares"],
-                "transaction_code": t["transactionCode"],
-                "accession_url": acc_base,
-                "xml_url": xml_url_final or "",
-            }
-            rows.append(row)
-            kept += 1
-            if print_passed:
-                msg = f"PASS {day} | {header.get('issuerTradingSymbol','')} {header.get('issuerName','')} <- {t['rptOwnerName']} [{t['transactionCode']}] {row['trade_date']}"
-                await q.put(msg)
-        return kept, raw, rows
-
-    kept_total = 0
-    raw_total = 0
-    rows_to_write: List[dict] = []
-
-    async def runner():
-        nonlocal kept_total, raw_total, rows_to_write
-        rl = RateLimiter(rps=2.0)  # global polite rate limit
-        limits = httpx.Limits(max_keepalive_connections=8, max_connections=8)
-        async with httpx.AsyncClient(
-            http2=True, headers=HEADERS, limits=limits
-        ) as client:
-            q: asyncio.Queue[str] = asyncio.Queue()
-
-            async def printer():
-                while True:
-                    msg = await q.get()
-                    if msg is None:
-                        break
-                    print(msg, flush=True)
-                    q.task_done()
-
-            printer_task = asyncio.create_task(printer())
-
-            async def worker(filing: FilingRef):
-                nonlocal kept_total, raw_total, rows_to_write
-                kept, raw, rows = await process_filing_async(client, rl, filing, q)
-                kept_total += kept
-                raw_total += raw
-                if rows:
-                    rows_to_write.extend(rows)
+    return len(rows), raw, rows
 
-            tasks = [asyncio.create_task(worker(f)) for f in filings]
-            await asyncio.gather(*tasks)
 
-            if print_passed:
-                await q.put(None)
-                await q.join()
-            await printer_task
+async def process_days_async(
+    days: List[dt.date],
+    output: CsvOutput,
+    session: requests.Session,
+    client: httpx.AsyncClient,
+    *,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    concurrency: int,
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+    print_passed: bool,
+    cache: Optional[XmlCache] = None,
+    index_store: Optional[IndexStore] = None,
+    index_mode: str = "full",
+    filings_by_day: Optional[Dict[dt.date, List[FilingRef]]] = None,
+    xml_source: str = "probe",
+    probe_stats: Optional[ProbeStats] = None,
+    parse_pool: Optional[Executor] = None,
+    issuer_map: Optional[IssuerMap] = None,
+    head_screen: Optional[HeadScreen] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    append: bool = False,
+    on_day: Optional[Callable[[dt.date, int, int, int], None]] = None,
+) -> None:
+    """
+    One bounded pipeline for all `days`: `concurrency` workers fetch ahead of
+    a writer that keeps index order; on_day(day, n, kept, raw) per day written.
+    """
+    ledger = output.ledger
+    n_workers = max(concurrency, 1)
+    jobs: asyncio.Queue = asyncio.Queue(maxsize=n_workers)
+    results: asyncio.Queue = asyncio.Queue()
+    window = asyncio.Semaphore(n_workers * REORDER_WINDOW)
+    loop = asyncio.get_running_loop()
+    listed = [loop.create_future() for _ in days]  # each day's filings
+
+    async def produce():
+        for d, day in enumerate(days):
+            if filings_by_day is not None:
+                filings = filings_by_day.get(day, [])
+            else:
+                if breaker:
+                    await breaker.acquire()
+                idx_text = await asyncio.to_thread(
+                    fetch_daily_schedule_index, day, session, index_store, index_mode
+                )
+                if idx_text is None:
+                    listed[d].set_result(None)  # IndexUnavailable; see write()
+                    continue
+                filings = parse_schedule_index(idx_text)
+            if issuer_map:
+                filings = issuer_map.select(filings)
+            filings = one_per_accession(filings)
+            if ledger:
+                filings = ledger.unwritten(filings)
+            listed[d].set_result(filings)
+            for seq, f in enumerate(filings):
+                await window.acquire()
+                await jobs.put((d, seq, f))
+        for _ in range(n_workers):
+            await jobs.put(None)
+
+    async def fetch():
+        while True:
+            item = await jobs.get()
+            if item is None:
+                return
+            d, seq, f = item
+            res = await process_filing_async(
+                client,
+                rl,
+                retry,
+                days[d],
+                f,
+                allowed_codes=allowed_codes,
+                tenpct_required=tenpct_required,
+                drop_otc=drop_otc,
+                print_passed=print_passed,
+                cache=cache,
+                xml_source=xml_source,
+                probe_stats=probe_stats,
+                parse_pool=parse_pool,
+                issuer_map=issuer_map,
+                head_screen=head_screen,
+                ledger=ledger,
+                breaker=breaker,
+            )
+            await results.put(((d, seq), res))
+
+    async def write():
+        ready: Dict[
+            Tuple[int, int], Optional[Tuple[int, int, Optional[List[dict]]]]
+        ] = {}
+        for d, day in enumerate(days):
+            filings = await listed[d]
+            if filings is None:
+                print(f"[WARN] {day}: no index available; left for the next run")
+                continue
+            totals = [0, 0]  # kept, raw
+            with output.append(day) if append else output.day(day) as writer:
+                for seq, f in enumerate(filings):
+                    if (d, seq) not in ready:
+                        output.flush()  # everything up to here is written
+                        while (d, seq) not in ready:
+                            key, res = await results.get()
+                            ready[key] = res
+                    res = ready.pop((d, seq))
+                    if res is None:
+                        ledger.mark(f, RunLedger.DEFERRED)
+                        window.release()
+                        continue
+                    kept, raw, rows = res
+                    totals[0] += kept
+                    totals[1] += raw
+                    for row in rows or ():
+                        writer.writerow(row)
+                    if ledger:
+                        status = RunLedger.FAILED if rows is None else RunLedger.WRITTEN
+                        ledger.mark(f, status, kept)
+                    window.release()
+                output.flush()
+            if on_day:
+                on_day(day, len(filings), totals[0], totals[1])
+
+    tasks = [asyncio.ensure_future(produce()), asyncio.ensure_future(write())]
+    tasks += [asyncio.ensure_future(fetch()) for _ in range(n_workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
 
-    asyncio.run(runner())
 
-    for row in rows_to_write:
-        writer.writerow(row)
+async def run_days_async(
+    days: List[dt.date],
+    output: CsvOutput,
+    session: requests.Session,
+    *,
+    rl: RateLimiter,
+    concurrency: int,
+    retry: RetryPolicy,
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+    print_passed: bool,
+    cache: Optional[XmlCache] = None,
+    index_store: Optional[IndexStore] = None,
+    index_mode: str = "full",
+    filings_by_day: Optional[Dict[dt.date, List[FilingRef]]] = None,
+    xml_source: str = "probe",
+    probe_stats: Optional[ProbeStats] = None,
+    parse_pool: Optional[Executor] = None,
+    issuer_map: Optional[IssuerMap] = None,
+    head_screen: Optional[HeadScreen] = None,
+    http2: bool = False,
+    retry_wait: float = 0.0,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None,
+) -> Tuple[int, int]:
+    """
+    One event loop, client, limiter and pipeline for the whole run, so the
+    days run back to back without draining in between. With `parse_pool`
+    the XML parsing runs there and the loop itself only does I/O. Filings
+    that fail in the main pass are retried from output.ledger at the end.
+    Past the deadline the day in progress is cancelled and the totals of the
+    days already written are returned.
+    """
+    deadline = deadline or Deadline()
+    totals = [0, 0]  # kept, raw
+    first_pass = replace(retry, tries=min(retry.tries, FIRST_PASS_TRIES))
 
-    return (kept_total, raw_total)
+    def scanned(day: dt.date, n: int, kept: int, raw: int) -> None:
+        totals[0] += kept
+        totals[1] += raw
+        print(f"{day}: scanned {raw} txs, kept {kept}")
 
+    def retried(day: dt.date, n: int, kept: int, raw: int) -> None:
+        totals[0] += kept
+        totals[1] += raw
+        print(f"{day}: retried {n} filings, kept {kept}")
 
-def make_session(user_agent: str) -> requests.Session:
-    s = requests.Session()
-    s.headers.update({"User-Agent": user_agent})
-    retry = Retry(
-        total=6,
-        connect=6,
-        read=6,
-        backoff_factor=0.6,  # 0.6s, 1.2s, 2.4s, ...
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"],
-        raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16)
-    s.mount("https://", adapter)
-    s.mount("http://", adapter)
-    return s
+    try:
+        async with make_async_client(HEADERS, concurrency, http2) as client:
+            pipeline = process_days_async(
+                days,
+                output,
+                session,
+                client,
+                rl=rl,
+                retry=first_pass,
+                concurrency=concurrency,
+                allowed_codes=allowed_codes,
+                tenpct_required=tenpct_required,
+                drop_otc=drop_otc,
+                print_passed=print_passed,
+                cache=cache,
+                index_store=index_store,
+                index_mode=index_mode,
+                filings_by_day=filings_by_day,
+                xml_source=xml_source,
+                probe_stats=probe_stats,
+                parse_pool=parse_pool,
+                issuer_map=issuer_map,
+                head_screen=head_screen,
+                breaker=breaker,
+                on_day=scanned,
+            )
+            await deadline.bound(pipeline)
+
+            ledger = output.ledger
+            drain = deadline.within(retry_wait)
+            rounds = ledger.retry_rounds(output.can_append, drain.left()) if ledger else ()
+            for delay in rounds:
+                await asyncio.sleep(delay)
+                due = ledger.due_by_day(output.can_append)
+                pipeline = process_days_async(
+                    list(due),
+                    output,
+                    session,
+                    client,
+                    rl=rl,
+                    retry=retry,
+                    concurrency=concurrency,
+                    allowed_codes=allowed_codes,
+                    tenpct_required=tenpct_required,
+                    drop_otc=drop_otc,
+                    print_passed=print_passed,
+                    cache=cache,
+                    filings_by_day=due,
+                    xml_source=xml_source,
+                    probe_stats=probe_stats,
+                    parse_pool=parse_pool,
+                    issuer_map=issuer_map,
+                    head_screen=head_screen,
+                    breaker=breaker,
+                    append=True,
+                    on_day=retried,
+                )
+                await drain.bound(pipeline)
+    except DeadlineReached:
+        pass  # the cancelled day stays unfinished; see Deadline
+    return totals[0], totals[1]
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument(
-        "--csv", required=True, help="Output CSV path (overwritten each run)"
+        "--csv",
+        default=None,
+        help="Output CSV path (overwritten each run unless --resume)",
+    )
+    ap.add_argument(
+        "--out_dir",
+        default=None,
+        help="Write one CSV per filing date under this dir; finished days are skipped on rerun",
+    )
+    ap.add_argument(
+        "--retry_wait",
+        type=float,
+        default=60.0,
+        help="Seconds the end-of-run retry of failed filings may take, waits included",
+    )
+    ap.add_argument(
+        "--failed_csv",
+        default=None,
+        help="Write the filings the retry queue gave up on to this CSV",
+    )
+    ap.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Stop after this many minutes; unfinished filings are left to the "
+        "next run (with --out_dir or --resume)",
+    )
+    ap.add_argument(
+        "--breaker_failures",
+        type=int,
+        default=10,
+        help="Pause dispatch after failures on this many different SEC URLs "
+        "with no success between (0: never)",
+    )
+    ap.add_argument(
+        "--breaker_cooldown",
+        type=float,
+        default=30.0,
+        help="Seconds the breaker stays open (doubled while SEC keeps failing)",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Poll the current-filings feed and process new Form 4s as they "
+        "are accepted, until Ctrl-C or --deadline",
+    )
+    ap.add_argument(
+        "--poll",
+        type=float,
+        default=60.0,
+        help="--watch: seconds between feed polls",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to --csv, skipping filings already written to it "
+        "(ledger at CSV.ledger; always on with --out_dir)",
     )
     ap.add_argument(
         "--user_agent", default=None, help="SEC User-Agent with contact info"
@@ -810,7 +2866,130 @@ def main():
         default=1,
         help="How many latest available index days to fetch",
     )
+    ap.add_argument("--date", default=None, help="Single filing date YYYY-MM-DD")
+    ap.add_argument(
+        "--start",
+        default=None,
+        help="Backfill from this filing date (YYYY-MM-DD) via quarterly full-index",
+    )
+    ap.add_argument(
+        "--end", default=None, help="Backfill end date, inclusive (default today)"
+    )
+    ap.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default="async",
+        help="async: concurrent httpx pipeline; sync: one request at a time",
+    )
+    ap.add_argument(
+        "--rps", type=float, default=5.0, help="Async: starting SEC requests per second"
+    )
+    ap.add_argument(
+        "--max_rps",
+        type=float,
+        default=10.0,
+        help="Async: the adaptive limiter ramps up to this (SEC fair-access ceiling)",
+    )
+    ap.add_argument(
+        "--concurrency", type=int, default=8, help="Async: filings in flight"
+    )
+    ap.add_argument(
+        "--retries", type=int, default=4, help="Async: tries per request"
+    )
+    ap.add_argument(
+        "--retry_backoff",
+        type=float,
+        default=0.5,
+        help="Async: base backoff in seconds (doubled per retry)",
+    )
+    ap.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Async: send one duplicate of a request still unanswered after "
+        "the observed --hedge_quantile latency; the first response wins",
+    )
+    ap.add_argument(
+        "--hedge_quantile",
+        type=float,
+        default=0.95,
+        help="Async: latency quantile that triggers a hedge (per host)",
+    )
+    ap.add_argument(
+        "--cache_dir",
+        default=DEFAULT_CACHE_DIR,
+        help="On-disk cache for filed XML (reused across runs)",
+    )
+    ap.add_argument(
+        "--cache_max_mb",
+        type=int,
+        default=512,
+        help="Evict least recently used XML beyond this size",
+    )
+    ap.add_argument("--no_cache", action="store_true", help="Always refetch XML")
+    ap.add_argument(
+        "--xml_source",
+        choices=["txt", "probe"],
+        default="txt",
+        help="txt: one request per filing via the full submission .txt; "
+        "probe: try form4.xml / primary_doc.xml / -index.htm links",
+    )
+    ap.add_argument(
+        "--index_mode",
+        choices=["range", "full"],
+        default="range",
+        help="range: download only the Form 4 rows of each daily index",
+    )
+    ap.add_argument(
+        "--parse_pool",
+        choices=["auto", "process", "thread", "inline"],
+        default="auto",
+        help="Async: where filings are parsed (auto: process pool if >1 CPU; "
+        "inline: on the event loop)",
+    )
+    ap.add_argument(
+        "--parse_workers",
+        type=int,
+        default=0,
+        help="Async: parse pool size (default: CPU count)",
+    )
+    ap.add_argument(
+        "--http2",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help="Async: HTTP/2 when the h2 package is installed (auto), "
+        "otherwise a keep-alive HTTP/1.1 pool",
+    )
+    ap.add_argument(
+        "--head_screen",
+        action="store_true",
+        help="Async: stream each filing and stop downloading once its head "
+        "rules it out (OTC issuer, no eligible owner, no allowed code)",
+    )
+    ap.add_argument(
+        "--no_issuer_map",
+        action="store_true",
+        help="Judge OTC issuers by ticker symbol instead of SEC's exchange map",
+    )
+    ap.add_argument(
+        "--budget_rps",
+        type=float,
+        default=10.0,
+        help="Requests per second shared by all scraper processes on this host",
+    )
+    ap.add_argument(
+        "--priority",
+        choices=["auto", "high", "low"],
+        default="auto",
+        help="Claim on the shared budget (auto: low for --start backfills)",
+    )
+    ap.add_argument(
+        "--no_shared_budget",
+        action="store_true",
+        help="Ignore other scraper processes (per-process limits only)",
+    )
     args = ap.parse_args()
+    if not args.csv and not args.out_dir:
+        ap.error("one of --csv or --out_dir is required")
 
     if args.user_agent:
         HEADERS["User-Agent"] = args.user_agent
@@ -820,52 +2999,277 @@ def main():
     }
     tenpct_required = not args.no_tenpct_filter
     drop_otc = not args.keep_otc
+    deadline = Deadline(args.deadline)
+
+    budget = None
+    if not args.no_shared_budget and fcntl is not None:
+        priority = args.priority
+        if priority == "auto":
+            priority = "low" if args.start else "high"
+        budget = SharedBudget(
+            os.path.join(args.cache_dir, "budget.json"), args.budget_rps, priority
+        )
+    # one SEC schedule for the sync calls too (index, issuer map, sync engine)
+    limits = {"www.sec.gov": budget} if budget else None
+    s = make_session(HEADERS, limits=limits)
+    breaker = None
+    if args.breaker_failures > 0:
+        host = host_of(EDGAR_ARCHIVES)
+        breaker = BREAKERS[host] = CircuitBreaker(
+            host, args.breaker_failures, args.breaker_cooldown
+        )
+    cache = (
+        None
+        if args.no_cache
+        else XmlCache(
+            os.path.join(args.cache_dir, "xml"), args.cache_max_mb * 1024 * 1024
+        )
+    )
+    index_store = IndexStore(
+        None if args.no_cache else os.path.join(args.cache_dir, "index")
+    )
+    probe_stats = ProbeStats(
+        None if args.no_cache else os.path.join(args.cache_dir, "probe")
+    )
+
+    issuer_map = None
+    filings_by_day = None
+    try:
+        if drop_otc and not args.no_issuer_map:
+            issuer_map = IssuerMap.load(
+                s,
+                None
+                if args.no_cache
+                else os.path.join(args.cache_dir, "company_tickers_exchange.json"),
+                deadline,
+            )
+        if args.watch:
+            days = []  # the feed decides
+        elif args.start:
+            start = dt.date.fromisoformat(args.start)
+            end = dt.date.fromisoformat(args.end) if args.end else dt.date.today()
+            store = IndexStore(
+                None if args.no_cache else os.path.join(args.cache_dir, "full-index")
+            )
+            filings_by_day = backfill_filings(
+                start, end, s, store, args.index_mode, deadline
+            )
+            days = list(filings_by_day)
+        elif args.date:
+            days = [dt.date.fromisoformat(args.date)]
+        else:
+            # latest N available index days (skips weekends/holidays/early mornings)
+            days = recent_available_days(
+                args.days, s, store=index_store, deadline=deadline
+            )
+    except DeadlineReached:
+        print("[WARN] --deadline reached before the first day was started")
+        print(METRICS.report())
+        return
 
-    fieldnames = [
-        "buyer",
-        "issuer",
-        "ticker",
-        "trade_date",
-        "filing_date",
-        "price",
-        "price_min_from_note",
-        "price_max_from_note",
-        "shares",
-        "transaction_code",
-        "accession_url",
-        "xml_url",
-    ]
-
-    s = make_session(HEADERS["User-Agent"])
-
-    # find the latest N available index days (skips weekends/holidays/early mornings)
-    days = recent_available_days(args.days, s)
-    if not days:
+    # a plain --csv run still needs one for its in-run retry queue
+    persistent = bool(args.out_dir or args.resume)
+    if args.out_dir:
+        ledger = RunLedger(os.path.join(args.out_dir, "ledger.sqlite"))
+    else:
+        ledger = RunLedger(args.csv + ".ledger" if args.resume else ":memory:")
+    settings = json.dumps(
+        [sorted(allowed_codes), tenpct_required, drop_otc, args.no_issuer_map]
+    )
+    if args.out_dir and ledger.settings_changed(settings):
+        # finished day files are skipped as done and take late retry rows,
+        # so mixing filters in one directory would go unnoticed
+        if glob.glob(os.path.join(args.out_dir, "*", "form4_*.csv")):
+            ledger.close()
+            ap.error(
+                f"filters changed since {args.out_dir} was written; "
+                "use a new --out_dir or remove the old one"
+            )
+    ledger.check_settings(settings)
+    output = CsvOutput(CSV_FIELDS, args.csv, args.out_dir, ledger)
+    if not days and not args.watch:
         print("No available daily index found in lookback window.")
-        with open(args.csv, "w", newline="", encoding="utf-8") as f:
-            csv.DictWriter(f, fieldnames=fieldnames).writeheader()
+        output.close()
+        ledger.close()
         return
+    pending = [d for d in days if not output.done(d)]
+    if len(pending) < len(days):
+        print(f"Resuming: {len(days) - len(pending)} day(s) already written")
 
     total_kept = total_raw = 0
-    with open(args.csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for day in days:
-            kept, raw = process_date(
-                day,
-                w,
+    parse_pool = None
+    feed = lag = None
+    try:
+        if args.watch:
+            feed = CurrentFeed(s, issuer_map)
+            lag = AcceptanceLag()
+            total_kept, total_raw = watch_current_filings(
+                feed,
+                output,
                 s,
-                args.sleep,
-                allowed_codes,
-                tenpct_required,
-                drop_otc,
-                args.print_passed,
+                make_session(HEADERS, limits=limits, retries=FIRST_PASS_TRIES - 1),
+                poll_s=args.poll,
+                sleep_s=args.sleep,
+                allowed_codes=allowed_codes,
+                tenpct_required=tenpct_required,
+                drop_otc=drop_otc,
+                print_passed=args.print_passed,
+                lag=lag,
+                cache=cache,
+                xml_source=args.xml_source,
+                probe_stats=probe_stats,
+                issuer_map=issuer_map,
+                breaker=breaker,
+                deadline=deadline,
             )
-            total_kept += kept
-            total_raw += raw
-            print(f"{day}: scanned {raw} txs, kept {kept}")
-
+        elif args.engine == "async":
+            hedge = Hedger(args.hedge_quantile) if args.hedge else None
+            retry = RetryPolicy(
+                tries=max(args.retries, 1), backoff=args.retry_backoff, hedge=hedge
+            )
+            rl = RateLimiter(rps=args.rps, max_rps=args.max_rps, shared=budget)
+            parse_pool = make_parse_pool(args.parse_pool, args.parse_workers)
+            http2 = args.http2 != "off" and http2_available()
+            if args.http2 == "on" and not http2:
+                print("[WARN] --http2 on needs the h2 package; using HTTP/1.1")
+            head_screen = (
+                HeadScreen(allowed_codes, tenpct_required, drop_otc, issuer_map)
+                if args.head_screen
+                else None
+            )
+            COALESCE.key = archive_key
+            total_kept, total_raw = asyncio.run(
+                run_days_async(
+                    pending,
+                    output,
+                    s,
+                    rl=rl,
+                    concurrency=args.concurrency,
+                    retry=retry,
+                    allowed_codes=allowed_codes,
+                    tenpct_required=tenpct_required,
+                    drop_otc=drop_otc,
+                    print_passed=args.print_passed,
+                    cache=cache,
+                    index_store=index_store,
+                    index_mode=args.index_mode,
+                    filings_by_day=filings_by_day,
+                    xml_source=args.xml_source,
+                    probe_stats=probe_stats,
+                    parse_pool=parse_pool,
+                    issuer_map=issuer_map,
+                    head_screen=head_screen,
+                    http2=http2,
+                    retry_wait=args.retry_wait,
+                    breaker=breaker,
+                    deadline=deadline,
+                )
+            )
+            print(rl.summary())
+            print(COALESCE.report())
+            if hedge:
+                print(hedge.report())
+            if head_screen:
+                print(head_screen.report())
+        else:
+            # filings fail fast and go to the retry queue, whose rounds are the
+            # real backoff; the index fetch keeps the patient session
+            fast = make_session(HEADERS, limits=limits, retries=FIRST_PASS_TRIES - 1)
+            for day in pending:
+                try:
+                    with output.day(day) as w:
+                        kept, raw = process_date(
+                            day,
+                            w,
+                            s,
+                            sleep_s=args.sleep,
+                            allowed_codes=allowed_codes,
+                            tenpct_required=tenpct_required,
+                            drop_otc=drop_otc,
+                            print_passed=args.print_passed,
+                            cache=cache,
+                            index_store=index_store,
+                            index_mode=args.index_mode,
+                            filings=(
+                                filings_by_day.get(day, []) if filings_by_day else None
+                            ),
+                            xml_source=args.xml_source,
+                            probe_stats=probe_stats,
+                            issuer_map=issuer_map,
+                            flush=output.flush,
+                            ledger=ledger,
+                            tries=FIRST_PASS_TRIES,
+                            filing_session=fast,
+                            breaker=breaker,
+                            deadline=deadline,
+                        )
+                except IndexUnavailable:
+                    print(f"[WARN] {day}: no index available; left for the next run")
+                    continue
+                total_kept += kept
+                total_raw += raw
+                print(f"{day}: scanned {raw} txs, kept {kept}")
+            drain = deadline.within(args.retry_wait)
+            for delay in ledger.retry_rounds(output.can_append, drain.left()):
+                time.sleep(delay)
+                for day, filings in ledger.due_by_day(output.can_append).items():
+                    with output.append(day) as w:
+                        kept, raw = process_date(
+                            day,
+                            w,
+                            s,
+                            sleep_s=args.sleep,
+                            allowed_codes=allowed_codes,
+                            tenpct_required=tenpct_required,
+                            drop_otc=drop_otc,
+                            print_passed=args.print_passed,
+                            cache=cache,
+                            filings=filings,
+                            xml_source=args.xml_source,
+                            probe_stats=probe_stats,
+                            issuer_map=issuer_map,
+                            flush=output.flush,
+                            ledger=ledger,
+                            filing_session=fast,
+                            breaker=breaker,
+                            deadline=drain,
+                        )
+                    total_kept += kept
+                    total_raw += raw
+                    print(f"{day}: retried {len(filings)} filings, kept {kept}")
+    except DeadlineReached:
+        pass  # the day in progress stays unfinished; see Deadline
+    finally:
+        if parse_pool:
+            parse_pool.shutdown(cancel_futures=True)
+        output.close()
+        if args.failed_csv:
+            ledger.write_failed(args.failed_csv)
+        retry_report = ledger.retry_report()
+        ledger.close()
+        probe_stats.save()
+
+    if deadline.reached and not args.watch:
+        carry = "left to the next run" if persistent else "dropped (see --resume)"
+        print(f"[WARN] --deadline reached; unfinished filings are {carry}")
     print(f"Done. Total kept: {total_kept} (from {total_raw} parsed transactions).")
+    if cache:
+        print(f"XML cache: {cache.hits} hits, {cache.misses} misses")
+    if issuer_map:
+        print(
+            f"Issuer map: skipped {issuer_map.skipped} of {issuer_map.seen} "
+            "filings with no exchange-listed issuer before fetching"
+        )
+    if persistent:
+        print(ledger.report())
+    print(retry_report)
+    if feed:
+        print(feed.report())
+        print(lag.report())
+    if breaker:
+        print(breaker.report())
+    print(probe_stats.report())
+    print(METRICS.report())
 
 
 if __name__ == "__main__":
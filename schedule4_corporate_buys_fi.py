@@ -10,34 +10,22 @@ Exempel:
   python fi_last3.py --out out_fi_last3.csv --issuer "Intrum" --days 5
 """
 
-import argparse, io, sys, time
+import argparse, io, sys
 from datetime import datetime, date
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from schedule4_http import METRICS, HostLimiter, get_with_retries, host_of, make_session
 
 BASE = "https://marknadssok.fi.se/publiceringsklient/en-GB/Search/Search"
 UA = "InsynLast3/1.0 (+you@example.com)"
 HEADERS = {"User-Agent": UA, "Accept-Language": "en-GB,en;q=0.8,sv-SE;q=0.7"}
 
 
-def make_session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update(HEADERS)
-    retry = Retry(
-        total=6,
-        connect=6,
-        read=6,
-        backoff_factor=0.7,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=8, pool_maxsize=8)
-    s.mount("https://", adapter)
-    s.mount("http://", adapter)
-    return s
+def make_fi_session(sleep: float) -> requests.Session:
+    # --sleep blir en gräns per värd (1/sleep anrop/s) i stället för fasta pauser
+    limits = {host_of(BASE): HostLimiter(1.0 / sleep)} if sleep > 0 else None
+    return make_session(HEADERS, limits=limits, pool=8, backoff=0.7)
 
 
 def dparse(s: str):
@@ -59,17 +47,15 @@ def fetch_page(
         "Page": page,
         "paging": "True",
     }
-    for i in range(tries):
-        try:
-            r = session.get(BASE, params=params, timeout=timeout)
-            r.raise_for_status()
-            print(f"[DEBUG] GET p={page} -> {r.status_code} ({len(r.text)} bytes)")
-            return r.text
-        except requests.RequestException as e:
-            wait = (2**i) * sleep
-            print(f"[WARN] page {page} fetch error: {e} -> retry in {wait:.1f}s")
-            time.sleep(wait)
-    raise RuntimeError(f"Failed to fetch page {page} after {tries} tries")
+    # 429/5xx hanteras av sessionens Retry, timeouts/nätfel av get_with_retries
+    r = get_with_retries(
+        BASE, session, tries=tries, params=params, timeout=(5, timeout), backoff=sleep
+    )
+    if r is None or r.status_code != 200:
+        status = "no response" if r is None else f"HTTP {r.status_code}"
+        raise RuntimeError(f"Failed to fetch page {page} after {tries} tries ({status})")
+    print(f"[DEBUG] GET p={page} -> {r.status_code} ({len(r.text)} bytes)")
+    return r.text
 
 
 def extract_table(html: str) -> pd.DataFrame | None:
@@ -91,7 +77,7 @@ def scrape_last_n_publication_days(
     Gå nedåt i listan tills vi har hittat N unika publiceringsdatum.
     Fortsätt tills sidorna blir äldre än det äldsta av de N – då kan vi stoppa.
     """
-    sess = make_session()
+    sess = make_fi_session(sleep)
     collected_frames = []
     unique_dates: list[date] = []
 
@@ -166,8 +152,6 @@ def scrape_last_n_publication_days(
             )
             break
 
-        time.sleep(sleep)
-
     if not collected_frames:
         return pd.DataFrame()
 
@@ -208,6 +192,7 @@ def main():
     df = scrape_last_n_publication_days(
         args.days, args.issuer, args.start_page, args.max_pages, args.sleep
     )
+    print(METRICS.report())
     if df.empty:
         print("No rows found for the latest days.")
         pd.DataFrame().to_csv(args.out, index=False)
@@ -0,0 +1,856 @@
+"""
+Shared HTTP layer for the SEC and FI scrapers.
+
+- make_session(): pooled requests.Session with urllib3 retries (jittered
+  backoff, Retry-After honored) and optional per-host limiters, e.g. a
+  HostLimiter for one process or a SharedBudget for every process on the host.
+- get_with_retries(): GET that also survives timeouts/connection errors.
+- make_async_client() / get_httpx(): the async engine's pooled httpx client
+  (HTTP/2 when `h2` is installed) and its AIMD RateLimiter + RetryPolicy.
+- METRICS: per-host request counts, bytes, retries and latency for both
+  engines; print METRICS.report() at the end of a run.
+- BREAKERS: optional per-host CircuitBreaker that both engines feed; while
+  it is open, retries give up and dispatchers pause.
+
+Response caches stay with the sources that can use them (the SEC scraper's
+XmlCache/IndexStore); FI search pages are live and are never cached.
+"""
+
+import asyncio
+import datetime as dt
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, each process keeps its own limiter
+    fcntl = None
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429, 503}
+
+# screened downloads: remainders smaller than this are drained rather than
+# aborted, because closing mid-body drops the keep-alive connection
+SCREEN_ABORT_MIN = 32 * 1024
+
+
+# ---- Metrics ----
+class FetchMetrics:
+    """Per-host counters shared by the sync session and the async client."""
+
+    LATENCY_SAMPLES = 2000
+
+    def __init__(self):
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        h = self.hosts.get(host)
+        if h is None:
+            h = self.hosts[host] = {
+                "requests": 0,
+                "bytes": 0,
+                "retries": 0,
+                "throttled": 0,
+                "errors": 0,
+                "latency": deque(maxlen=self.LATENCY_SAMPLES),
+            }
+        return h
+
+    def response(self, host: str, nbytes: int, elapsed: float) -> None:
+        with self._lock:
+            h = self._host(host)
+            h["requests"] += 1
+            h["bytes"] += nbytes
+            h["latency"].append(elapsed)
+
+    def retry(self, host: str, throttled: bool = False) -> None:
+        with self._lock:
+            self._host(host)["throttled" if throttled else "retries"] += 1
+
+    def error(self, host: str) -> None:
+        with self._lock:
+            self._host(host)["errors"] += 1
+
+    def latency(self, host: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """q-quantile of the recent response times for host, None if too few."""
+        with self._lock:
+            samples = sorted(self.hosts.get(host, {}).get("latency", ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+    def report(self) -> str:
+        lines = []
+        for host in sorted(self.hosts):
+            h = self.hosts[host]
+            p50, p95, p99 = (self.latency(host, q) for q in (0.5, 0.95, 0.99))
+            lat = ""
+            if p50 is not None:
+                lat = f", p50 {p50:.2f}s p95 {p95:.2f}s p99 {p99:.2f}s"
+            lines.append(
+                f"HTTP {host}: {h['requests']} responses, {h['bytes'] // 1024} KB, "
+                f"{h['retries']} retries, {h['throttled']} throttled, "
+                f"{h['errors']} errors{lat}"
+            )
+        return "\n".join(lines) or "HTTP: no requests"
+
+
+METRICS = FetchMetrics()
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+# ---- Per-host limits (sync) ----
+class HostLimiter:
+    """Spaces requests to one host 1/rps apart across the threads of a process."""
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / max(rps, 0.01)
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SharedBudget:
+    """
+    One SEC request schedule for every scraper process on this host. The next
+    free slot lives in a small JSON file guarded by flock; each request
+    reserves the slot 1/rps after the previous one, whichever process made
+    it. A Retry-After seen by any process pauses all of them.
+
+    Priority: "high" (intraday polls, ad-hoc runs) queues for the next slot.
+    "low" (backfills) only takes a slot when nobody is queued ahead, and
+    while a high-priority process has been active in the last few seconds
+    it waits for the schedule to run completely dry, so a poll started
+    next to a backfill gets nearly the full budget.
+    """
+
+    HIGH_GRACE_S = 3.0
+
+    def __init__(self, path: str, rps: float = 10.0, priority: str = "high"):
+        self.path = path
+        self.interval = 1.0 / max(rps, 0.1)
+        self.high = priority == "high"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @contextmanager
+    def _state(self):
+        with open(self.path, "a+", encoding="utf-8") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                try:
+                    state = json.loads(fh.read() or "{}")
+                except ValueError:
+                    state = {}
+                yield state
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(state))
+                fh.flush()
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _reserve(self) -> Tuple[bool, float]:
+        """(got_slot, seconds to wait before sending / asking again)"""
+        with self._state() as st:
+            now = time.time()
+            slot = max(now, st.get("next", 0.0), st.get("pause_until", 0.0))
+            if self.high:
+                st["high_seen"] = now
+            else:
+                busy = now - st.get("high_seen", 0.0) < self.HIGH_GRACE_S
+                limit = 0.0 if busy else self.interval
+                if slot - now > limit:
+                    return False, max(slot - now, self.interval)
+            st["next"] = slot + self.interval
+            return True, slot - now
+
+    def wait(self) -> None:
+        while True:
+            ok, delay = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+            if ok:
+                return
+
+    async def acquire(self) -> None:
+        # flock blocks while another process holds the file; keep that (and
+        # the file I/O) off the event loop
+        while True:
+            ok, delay = await asyncio.to_thread(self._reserve)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if ok:
+                return
+
+    def pause(self, seconds: float) -> None:
+        with self._state() as st:
+            st["pause_until"] = max(st.get("pause_until", 0.0), time.time() + seconds)
+
+
+# ---- Circuit breaker ----
+class CircuitBreaker:
+    """
+    Opens after failures on `threshold` different URLs with no success between;
+    while open, retries give up and wait()/acquire() pause for the cooldown.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+    PROBE_INTERVAL_S = 2.0
+
+    def __init__(
+        self,
+        host: str,
+        threshold: int = 10,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+    ):
+        self.host = host
+        self.threshold = max(threshold, 1)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._failed: set = set()  # URLs failed since the last success
+        self._probe_failed = False
+        self.opened = 0
+        self.cooldown_s = 0.0  # total time spent open
+        self._until = 0.0  # OPEN: end of cooldown; HALF_OPEN: next probe slot
+        self._lock = threading.Lock()
+
+    @property
+    def tripped(self) -> bool:
+        return self.state == self.OPEN
+
+    def success(self) -> None:
+        with self._lock:
+            self._failed.clear()
+            self._probe_failed = False
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                self.cooldown = self.base_cooldown
+                print(f"[INFO] {self.host}: circuit closed", flush=True)
+
+    def failure(self, url: str = "") -> None:
+        with self._lock:
+            if self.state == self.OPEN:
+                return  # stragglers from before it opened
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._probe_failed = True
+                why = "probe failed"
+            else:
+                self._failed.add(url)
+                if len(self._failed) < self.threshold:
+                    return
+                why = f"failures on {len(self._failed)} URLs"
+            self.state = self.OPEN
+            self._failed.clear()
+            self.opened += 1
+            self.cooldown_s += self.cooldown
+            self._until = time.monotonic() + self.cooldown
+        print(
+            f"[WARN] {self.host}: circuit open after {why}, pausing {self.cooldown:.0f}s",
+            flush=True,
+        )
+
+    def delay(self) -> float:
+        """Seconds a dispatcher must wait before its next filing; 0 = go."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            now = time.monotonic()
+            if now < self._until:
+                return self._until - now
+            self.state = self.HALF_OPEN
+            self._until = now + self.PROBE_INTERVAL_S
+            return 0.0
+
+    def deferring(self) -> bool:
+        """Open again after a failed probe and still cooling down."""
+        with self._lock:
+            return (
+                self.state == self.OPEN
+                and self._probe_failed
+                and time.monotonic() < self._until
+            )
+
+    def wait(self, until: Optional[float] = None) -> bool:
+        """Block while open; False (without waiting) if that runs past `until`."""
+        while True:
+            d = self.delay()
+            if d <= 0:
+                return True
+            if until is not None and time.monotonic() + d > until:
+                return False
+            time.sleep(d)
+
+    async def acquire(self, defer: bool = False) -> bool:
+        """Wait while open; with `defer`, False at once while deferring()."""
+        while True:
+            if defer and self.deferring():
+                return False
+            d = self.delay()
+            if d <= 0:
+                return True
+            await asyncio.sleep(d)
+
+    def report(self) -> str:
+        return (
+            f"Circuit breaker {self.host}: opened {self.opened} time(s) "
+            f"({self.cooldown_s:.0f}s of cooldown), now {self.state}"
+        )
+
+
+# per-host breakers, registered by the scrapers that want one; the sync
+# session, get_with_retries and get_httpx all feed and honor them
+BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def record_outcome(host: str, failed: bool, url: str = "") -> None:
+    breaker = BREAKERS.get(host)
+    if breaker is None:
+        return
+    if failed:
+        breaker.failure(url)
+    else:
+        breaker.success()
+
+
+def breaker_tripped(host: str) -> bool:
+    breaker = BREAKERS.get(host)
+    return breaker is not None and breaker.tripped
+
+
+# ---- Sync session ----
+class LimitedRetry(Retry):
+    """
+    urllib3 Retry that reports each retry to METRICS and the host's breaker
+    and, after its backoff, waits on the host's limiter too: urllib3 retries
+    inside the adapter, so they would otherwise skip the per-host limits.
+    Once the breaker is open the request gives up (the last 5xx response is
+    returned, connection errors raise).
+    """
+
+    limits: Dict[str, Any] = {}
+    host = ""
+
+    def increment(self, method=None, url=None, response=None, error=None, **kwargs):
+        pool = kwargs.get("_pool")
+        host = pool.host if pool is not None else ""
+        METRICS.retry(
+            host, throttled=response is not None and response.status in THROTTLE_STATUS
+        )
+        if response is None or response.status != 429:
+            record_outcome(host, failed=True, url=url or "")
+        if breaker_tripped(host):
+            reason = error or ResponseError(f"circuit open for {host}")
+            raise MaxRetryError(pool, url, reason) from reason
+        new = super().increment(method, url, response, error, **kwargs)
+        new.limits, new.host = self.limits, host  # new() keeps only Retry's own fields
+        return new
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        limiter = self.limits.get(self.host)
+        if limiter is not None:
+            limiter.wait()
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that waits on the host's limiter (anything with wait(), e.g.
+    HostLimiter or SharedBudget) before every request and records METRICS
+    (failures reach the breaker through LimitedRetry).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Any]] = None, **kwargs):
+        self.limits = limits or {}
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        host = host_of(request.url)
+        limiter = self.limits.get(host)
+        if limiter is not None:
+            limiter.wait()
+        t0 = time.monotonic()
+        try:
+            r = super().send(request, **kwargs)
+            if not kwargs.get("stream"):
+                nbytes = len(r.content)  # Session would read it right after
+            else:
+                nbytes = int(r.headers.get("Content-Length") or 0)
+        except requests.RequestException:
+            METRICS.error(host)
+            raise
+        METRICS.response(host, nbytes, time.monotonic() - t0)
+        if r.status_code not in RETRY_STATUS:
+            record_outcome(host, failed=False)
+        return r
+
+
+def make_session(
+    headers: Dict[str, str],
+    limits: Optional[Dict[str, Any]] = None,
+    pool: int = 16,
+    backoff: float = 0.6,
+    retries: int = 6,
+) -> requests.Session:
+    """
+    limits maps a host name to its limiter; 429/5xx are retried by urllib3
+    up to `retries` times with `backoff` doubled per attempt (0.6s, 1.2s, ...).
+    """
+    s = requests.Session()
+    s.headers.update(headers)
+    retry = LimitedRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        backoff_factor=backoff,
+        status_forcelist=sorted(RETRY_STATUS),
+        allowed_methods=["GET", "POST"],
+        raise_on_status=False,
+    )
+    if limits:
+        retry.limits = limits
+    adapter = ThrottledAdapter(
+        limits, max_retries=retry, pool_connections=pool, pool_maxsize=pool
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_with_retries(
+    url: str,
+    session: requests.Session,
+    tries: int = 4,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Tuple[float, float] = (5, 60),
+    backoff: float = 0.5,
+) -> Optional[requests.Response]:
+    """
+    GET that also retries timeouts and network errors (the adapter already
+    retries 429/5xx). Headers come from the session. None when all tries fail
+    or the host's breaker opens.
+    """
+    for i in range(tries):
+        try:
+            return session.get(url, params=params, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if breaker_tripped(host_of(url)):
+                return None
+            # exponential backoff with jitter
+            if i + 1 < tries:
+                METRICS.retry(host_of(url))
+                time.sleep((2**i) * backoff + random.random() * 0.2)
+    return None
+
+
+# ---- Async client ----
+def http2_available() -> bool:
+    # httpx only speaks HTTP/2 with the optional `h2` package (httpx[http2])
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def client_limits(concurrency: int) -> httpx.Limits:
+    # HTTP/1.1: one keep-alive connection per in-flight request, reused
+    # across days; HTTP/2 multiplexes them all over a single connection
+    return httpx.Limits(
+        max_keepalive_connections=concurrency,
+        max_connections=concurrency,
+        keepalive_expiry=30,
+    )
+
+
+def make_async_client(
+    headers: Dict[str, str], concurrency: int, http2: bool = False
+) -> httpx.AsyncClient:
+    """
+    HTTP/2 is offered via ALPN when `h2` is installed; a server that does not
+    take it gets HTTP/1.1 on the same pooled client.
+    """
+    return httpx.AsyncClient(
+        headers=headers,
+        limits=client_limits(max(concurrency, 1)),
+        http2=http2 and http2_available(),
+    )
+
+
+@dataclass
+class RetryPolicy:
+    tries: int = 4
+    backoff: float = 0.5  # seconds; doubled per attempt, plus jitter
+    max_throttled: int = 20  # 429/503 re-queues per request (not counted as tries)
+    hedge: Optional["Hedger"] = None  # duplicate slow requests (see Hedger)
+
+    def delay(self, attempt: int) -> float:
+        return (2**attempt) * self.backoff + random.random() * 0.2
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delta-seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max((when - dt.datetime.now(dt.timezone.utc)).total_seconds(), 0.0)
+
+
+# central rate limiter (tokens per second)
+class RateLimiter:
+    """
+    Spaces requests 1/rps apart and adapts rps AIMD-style: each success adds
+    `step` req/s up to max_rps (SEC publishes 10 req/s as the ceiling), a
+    429/503 or a response slower than `slow_s` halves it (at most once per
+    second), and Retry-After pauses every caller until it has passed.
+    """
+
+    def __init__(
+        self,
+        rps: float = 2.0,
+        max_rps: Optional[float] = None,
+        min_rps: float = 0.2,
+        step: float = 0.05,
+        slow_s: float = 5.0,
+        shared: Optional[SharedBudget] = None,
+    ):
+        self.rps = max(rps, 0.1)
+        self.max_rps = max(max_rps or self.rps, self.rps)
+        self.min_rps = min(min_rps, self.rps)
+        self.step = step
+        self.slow_s = slow_s
+        self.shared = shared
+        self.throttled = 0
+        self.cuts = 0
+        self._next = time.monotonic()
+        self._pause_until = 0.0
+        self._last_cut = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            ready = max(self._next, self._pause_until)
+            if now < ready:
+                await asyncio.sleep(ready - now)
+            self._next = max(now, ready) + 1.0 / self.rps
+        if self.shared:
+            await self.shared.acquire()
+
+    def success(self, elapsed: float) -> None:
+        if elapsed > self.slow_s:
+            self._cut(f"slow response ({elapsed:.1f}s)")
+        else:
+            self.rps = min(self.max_rps, self.rps + self.step)
+
+    def throttle(self, status: int, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        if retry_after:
+            self._pause_until = max(
+                self._pause_until, time.monotonic() + retry_after
+            )
+            if self.shared:  # flock and file I/O, off the event loop
+                asyncio.get_running_loop().run_in_executor(
+                    None, self.shared.pause, retry_after
+                )
+        self._cut(f"HTTP {status}")
+
+    def _cut(self, why: str) -> None:
+        now = time.monotonic()
+        if now - self._last_cut < 1.0:
+            return
+        self._last_cut = now
+        self.cuts += 1
+        self.rps = max(self.min_rps, self.rps / 2)
+        print(f"[WARN] {why}: rate -> {self.rps:.2f} req/s", flush=True)
+
+    def summary(self) -> str:
+        return (
+            f"Rate limiter: settled at {self.rps:.2f} req/s "
+            f"(max {self.max_rps:.2f}; {self.throttled} throttled responses, "
+            f"{self.cuts} back-offs)"
+        )
+
+
+class Hedger:
+    """
+    Hedged GETs for the async engine: a request still unanswered after the
+    host's q-quantile latency (from METRICS, once MIN_SAMPLES responses are
+    in; never below min_delay) gets one duplicate, paced by the same rate
+    limiter. The first response wins and the other request is cancelled.
+    """
+
+    MIN_SAMPLES = 50
+    REFRESH = 50  # responses between re-reads of the quantile
+
+    def __init__(self, q: float = 0.95, min_delay: float = 0.1):
+        self.q = q
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self._delay: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    def delay(self, host: str) -> Optional[float]:
+        n, d = self._delay.get(host, (0, None))
+        if n % self.REFRESH == 0:
+            d = METRICS.latency(host, self.q, self.MIN_SAMPLES)
+            if d is not None:
+                d = max(d, self.min_delay)
+        self._delay[host] = (n + 1, d)
+        return d
+
+    async def get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        rl: RateLimiter,
+    ) -> httpx.Response:
+        def send():
+            return asyncio.ensure_future(
+                client.get(url, headers=headers, timeout=httpx.Timeout(60, connect=5))
+            )
+
+        self.requests += 1
+        delay = self.delay(host_of(url))
+        first = send()
+        tasks = {first}
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                slot = asyncio.ensure_future(rl.acquire())
+                tasks.add(slot)  # cancelled below if the caller is
+                done, _ = await asyncio.wait(
+                    {first, slot}, return_when=asyncio.FIRST_COMPLETED
+                )
+                tasks.discard(slot)
+                if first in done:
+                    slot.cancel()
+                else:
+                    self.hedged += 1
+                    tasks.add(send())
+            while True:
+                done, pending = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in done:
+                    if t.exception() is None:
+                        if t is not first:
+                            self.won += 1
+                        return t.result()
+                if not pending:
+                    return first.result()  # both failed: raise the original error
+                tasks = pending
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    def report(self) -> str:
+        extra = 100.0 * self.hedged / self.requests if self.requests else 0.0
+        return (
+            f"Hedging: {self.hedged} duplicate requests for {self.requests} "
+            f"({extra:.1f}% extra), {self.won} answered first"
+        )
+
+
+class Coalescer:
+    """
+    Concurrent get_httpx calls for the same resource share one request,
+    retries and limiter token included: the first caller starts it, later
+    ones await the same result (a response is only read after it is
+    complete, so sharing it is safe). `key` maps a URL to the resource it
+    names; the default is the URL itself.
+    """
+
+    def __init__(self, key: Optional[Callable[[str], str]] = None):
+        self.key = key or (lambda url: url)
+        self.inflight: Dict[str, list] = {}  # key -> [task, callers waiting]
+        self.requests = 0
+        self.joined = 0
+
+    async def get(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        k = self.key(url)
+        entry = self.inflight.get(k)
+        if entry is None:
+            self.requests += 1
+            entry = self.inflight[k] = [asyncio.ensure_future(fetch()), 0]
+        else:
+            self.joined += 1
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # a caller that is cancelled leaves the request to the others...
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if self.inflight.get(k) is entry and (task.done() or not entry[1]):
+                del self.inflight[k]
+                task.cancel()  # ...and the last one takes it down (no-op if done)
+                if task.done() and not task.cancelled():
+                    task.exception()  # retrieved even if no caller was left
+
+    def report(self) -> str:
+        return (
+            f"Coalescing: {self.joined} fetches joined one already in flight "
+            f"({self.requests} requests made)"
+        )
+
+
+# in-flight get_httpx calls without headers or a screen; a scraper may set
+# COALESCE.key to map URLs that name the same document onto one key
+COALESCE = Coalescer()
+
+
+async def screened_get(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Optional[Dict[str, str]],
+    doc: Any,
+) -> httpx.Response:
+    """
+    Streaming GET that feeds the body to `doc` (reset/feed/finish/rejected,
+    e.g. the SEC scraper's HeadDoc) and stops downloading once feed() returns
+    True (the returned body is then incomplete; check doc.rejected). Other
+    responses come back fully read.
+    """
+    doc.reset()
+    async with client.stream(
+        "GET", url, headers=headers, timeout=httpx.Timeout(60, connect=5)
+    ) as r:
+        if r.status_code != 200:
+            await r.aread()
+            return r
+        total = int(r.headers.get("content-length") or 0)
+        chunks = []
+        async for chunk in r.aiter_bytes():
+            if doc.feed(chunk) is True:
+                if total and total - r.num_bytes_downloaded < SCREEN_ABORT_MIN:
+                    continue
+                break
+            chunks.append(chunk)
+        doc.finish(r.num_bytes_downloaded, total)
+    # body is already decoded, so only the content type carries over
+    return httpx.Response(
+        r.status_code,
+        headers={"content-type": r.headers.get("content-type", "")},
+        content=b"".join(chunks),
+        request=r.request,
+    )
+
+
+async def get_httpx(
+    client: httpx.AsyncClient,
+    url: str,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    headers: Optional[Dict[str, str]] = None,
+    screen: Optional[Any] = None,
+) -> Optional[httpx.Response]:
+    """
+    Rate-limited GET. Timeouts, network errors and 5xx are retried with
+    exponential backoff; 429/503 feed the limiter and the request is queued
+    again without using up a try. Returns None once the budget is spent or
+    the host's breaker is open. With `screen` the body is streamed through it
+    (see screened_get); otherwise retry.hedge, if set, may duplicate a slow
+    request, and callers asking for the same URL at once share it (COALESCE).
+    """
+    if screen is not None or headers:
+        return await _get_httpx(client, url, rl, retry, headers, screen)
+    return await COALESCE.get(url, lambda: _get_httpx(client, url, rl, retry))
+
+
+async def _get_httpx(
+    client: httpx.AsyncClient,
+    url: str,
+    rl: RateLimiter,
+    retry: RetryPolicy,
+    headers: Optional[Dict[str, str]] = None,
+    screen: Optional[Any] = None,
+) -> Optional[httpx.Response]:
+    host = host_of(url)
+    tries = throttled = 0
+    while tries < retry.tries:
+        if breaker_tripped(host):
+            return None
+        await rl.acquire()
+        t0 = time.monotonic()
+        try:
+            if screen is not None:
+                r = await screened_get(client, url, headers, screen)
+            elif retry.hedge is not None:
+                r = await retry.hedge.get(client, url, headers, rl)
+            else:
+                r = await client.get(
+                    url, headers=headers, timeout=httpx.Timeout(60, connect=5)
+                )
+        except httpx.TransportError:
+            METRICS.error(host)
+            record_outcome(host, failed=True, url=url)
+            await asyncio.sleep(retry.delay(tries))
+            tries += 1
+            continue
+        elapsed = time.monotonic() - t0
+        METRICS.response(host, len(r.content), elapsed)
+        if r.status_code in RETRY_STATUS and r.status_code != 429:
+            record_outcome(host, failed=True, url=url)
+        if r.status_code in THROTTLE_STATUS:
+            wait = retry_after_seconds(r.headers.get("Retry-After"))
+            rl.throttle(r.status_code, wait)
+            METRICS.retry(host, throttled=True)
+            throttled += 1
+            if throttled > retry.max_throttled:
+                return None
+            if wait is None:
+                await asyncio.sleep(retry.delay(min(throttled - 1, 4)))
+            continue
+        if r.status_code in RETRY_STATUS:
+            METRICS.retry(host)
+            await asyncio.sleep(retry.delay(tries))
+            tries += 1
+            continue
+        rl.success(elapsed)
+        record_outcome(host, failed=False)
+        return r
+    return None
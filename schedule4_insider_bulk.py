@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+SEC Insider Transactions Data Sets (quarterly bulk) -> CSV
+
+What it does
+------------
+- Streams the quarterly `YYYYqN_form345.zip` files SEC publishes under
+  "Insider Transactions Data Sets" from local disk (no network).
+- Joins SUBMISSION, REPORTINGOWNER and NONDERIV_TRANS with pandas, one
+  chunk of transactions at a time, and applies the same filters as
+  schedule4_corporate_buys.filter_transactions (codes, 10% owners, OTC,
+  individual-looking owner names).
+- Fills missing prices from FOOTNOTES / REMARKS with the scraper's
+  footnote price parser.
+- Writes rows with the scraper's CSV schema (xml_url is left blank).
+
+Usage
+-----
+python schedule4_insider_bulk.py --zips data/2024q*_form345.zip --csv out_2024.csv \
+  --include_codes "P,C,A,S,D,F" [--start 2024-01-01] [--end 2024-12-31]
+
+Memory is bounded by one quarter's Form 4 submissions/owners, one chunk of
+transactions (--chunksize) and the rows that survive the filters.
+"""
+
+import argparse
+import csv
+import io
+import zipfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from schedule4_corporate_buys import (
+    CSV_FIELDS,
+    EDGAR_ARCHIVES,
+    likely_individual_name,
+    otc_symbol,
+    parse_price_from_text,
+)
+
+SUBMISSION_COLS = [
+    "ACCESSION_NUMBER",
+    "FILING_DATE",
+    "PERIOD_OF_REPORT",
+    "DOCUMENT_TYPE",
+    "ISSUERCIK",
+    "ISSUERNAME",
+    "ISSUERTRADINGSYMBOL",
+    "REMARKS",
+]
+OWNER_COLS = ["ACCESSION_NUMBER", "RPTOWNERNAME", "RPTOWNER_RELATIONSHIP"]
+TRANS_COLS = [
+    "ACCESSION_NUMBER",
+    "NONDERIV_TRANS_SK",
+    "TRANS_DATE",
+    "TRANS_CODE",
+    "TRANS_SHARES",
+    "TRANS_PRICEPERSHARE",
+]
+
+
+def read_tsv(zf: zipfile.ZipFile, name: str, usecols=None, chunksize=None):
+    member = next(
+        n for n in zf.namelist() if n.rsplit("/", 1)[-1].upper() == name.upper()
+    )
+    fh = io.TextIOWrapper(zf.open(member), encoding="utf-8", errors="replace")
+    return pd.read_csv(
+        fh,
+        sep="\t",
+        dtype=str,
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+        usecols=usecols,
+        chunksize=chunksize,
+    )
+
+
+def bulk_date(s: pd.Series) -> pd.Series:
+    # data sets use 02-JAN-2024; the scraper writes 2024-01-02
+    d = pd.to_datetime(s.str.strip(), format="%d-%b-%Y", errors="coerce")
+    return d.dt.strftime("%Y-%m-%d").fillna("")
+
+
+def load_submissions(
+    zf: zipfile.ZipFile,
+    drop_otc: bool,
+    start: Optional[str],
+    end: Optional[str],
+) -> pd.DataFrame:
+    sub = read_tsv(zf, "SUBMISSION.tsv", usecols=SUBMISSION_COLS)
+    sub = sub[sub["DOCUMENT_TYPE"].str.strip().str.upper().isin(["4", "4/A"])]
+    sub = sub.assign(
+        filing_date=bulk_date(sub["FILING_DATE"]),
+        period=bulk_date(sub["PERIOD_OF_REPORT"]),
+        ticker=sub["ISSUERTRADINGSYMBOL"].str.strip(),
+        issuer=sub["ISSUERNAME"].str.strip(),
+    )
+    if start:
+        sub = sub[sub["filing_date"] >= start]
+    if end:
+        sub = sub[sub["filing_date"] <= end]
+    if drop_otc:
+        symbols = sub["ticker"].drop_duplicates()
+        otc = dict(zip(symbols, symbols.map(otc_symbol)))
+        # astype: on an empty frame map() gives float64 and ~ would not mask
+        sub = sub[~sub["ticker"].map(otc).astype(bool)]
+    return sub.set_index("ACCESSION_NUMBER")[
+        ["filing_date", "period", "ticker", "issuer", "ISSUERCIK", "REMARKS"]
+    ]
+
+
+def load_owners(
+    zf: zipfile.ZipFile, accessions: pd.Index, tenpct_required: bool
+) -> pd.DataFrame:
+    own = read_tsv(zf, "REPORTINGOWNER.tsv", usecols=OWNER_COLS)
+    own = own[own["ACCESSION_NUMBER"].isin(accessions)]
+    own = own.assign(
+        buyer=own["RPTOWNERNAME"].str.strip(),
+        ten=own["RPTOWNER_RELATIONSHIP"].str.contains("TenPercentOwner", case=False),
+        owner_seq=own.groupby("ACCESSION_NUMBER").cumcount(),
+    )
+    if tenpct_required:
+        own = own[own["ten"]]
+    names = own["buyer"].drop_duplicates()
+    individual = dict(zip(names, names.map(likely_individual_name)))
+    own = own[~own["buyer"].map(individual).astype(bool)]
+    return own[["ACCESSION_NUMBER", "buyer", "owner_seq"]]
+
+
+def footnote_columns(zf: zipfile.ZipFile) -> List[str]:
+    head = read_tsv(zf, "NONDERIV_TRANS.tsv", chunksize=1)
+    cols = list(next(iter(head)).columns)
+    return [c for c in cols if c.endswith("_FN")]
+
+
+def kept_transactions(
+    zf: zipfile.ZipFile,
+    sub: pd.DataFrame,
+    own: pd.DataFrame,
+    allowed_codes: set,
+    chunksize: int,
+) -> pd.DataFrame:
+    fn_cols = footnote_columns(zf)
+    kept = []
+    for chunk in read_tsv(
+        zf, "NONDERIV_TRANS.tsv", usecols=TRANS_COLS + fn_cols, chunksize=chunksize
+    ):
+        chunk = chunk[
+            chunk["TRANS_CODE"].str.strip().str.upper().isin(allowed_codes)
+            & chunk["ACCESSION_NUMBER"].isin(sub.index)
+        ]
+        if chunk.empty:
+            continue
+        # footnote ids referenced anywhere in the transaction, in column order
+        fn_ids = pd.Series("", index=chunk.index)
+        for c in fn_cols:
+            fn_ids = fn_ids.str.cat(chunk[c].str.strip(), sep=",")
+        fn_ids = fn_ids.str.replace(r",{2,}", ",", regex=True).str.strip(",")
+        chunk = chunk.assign(fn_ids=fn_ids).drop(columns=fn_cols)
+        chunk = chunk.merge(own, on="ACCESSION_NUMBER", how="inner")
+        kept.append(chunk.join(sub, on="ACCESSION_NUMBER"))
+    if not kept:
+        return pd.DataFrame()
+    return pd.concat(kept, ignore_index=True)
+
+
+def needed_footnotes(
+    zf: zipfile.ZipFile, keys: set, chunksize: int
+) -> Dict[tuple, str]:
+    out: Dict[tuple, str] = {}
+    if not keys:
+        return out
+    accs = {a for a, _ in keys}
+    for chunk in read_tsv(zf, "FOOTNOTES.tsv", chunksize=chunksize):
+        chunk = chunk[chunk["ACCESSION_NUMBER"].isin(accs)]
+        for acc, fid, txt in zip(
+            chunk["ACCESSION_NUMBER"], chunk["FOOTNOTE_ID"], chunk["FOOTNOTE_TXT"]
+        ):
+            if (acc, fid) in keys:
+                out[(acc, fid)] = txt.strip()
+    return out
+
+
+def add_note_prices(
+    zf: zipfile.ZipFile, tx: pd.DataFrame, chunksize: int
+) -> pd.DataFrame:
+    """Same fallback as parse_schedule4_xml: tx footnotes first, then remarks."""
+    blank = tx["TRANS_PRICEPERSHARE"].str.strip() == ""
+    keys = {
+        (acc, fid)
+        for acc, ids in zip(tx.loc[blank, "ACCESSION_NUMBER"], tx.loc[blank, "fn_ids"])
+        for fid in ids.split(",")
+        if fid
+    }
+    notes = needed_footnotes(zf, keys, chunksize)
+    avg, lo, hi = [], [], []
+    for is_blank, acc, ids, remarks in zip(
+        blank, tx["ACCESSION_NUMBER"], tx["fn_ids"], tx["REMARKS"]
+    ):
+        pn = {
+            "price_avg_from_note": None,
+            "price_min_from_note": None,
+            "price_max_from_note": None,
+        }
+        if is_blank:
+            texts = [notes[(acc, f)] for f in ids.split(",") if (acc, f) in notes]
+            if remarks.strip():
+                texts.append(remarks.strip())
+            for txt in texts:
+                p = parse_price_from_text(txt)
+                if (
+                    p["price_avg_from_note"] is not None
+                    or p["price_min_from_note"] is not None
+                ):
+                    pn = p
+                    break
+        avg.append(pn["price_avg_from_note"])
+        lo.append(pn["price_min_from_note"])
+        hi.append(pn["price_max_from_note"])
+    return tx.assign(note_avg=avg, note_min=lo, note_max=hi)
+
+
+def to_rows(tx: pd.DataFrame) -> pd.DataFrame:
+    price = tx["TRANS_PRICEPERSHARE"].str.strip()
+    note_avg = tx["note_avg"].map(lambda v: "" if v is None or pd.isna(v) else v)
+    trade_date = bulk_date(tx["TRANS_DATE"])
+    return pd.DataFrame(
+        {
+            "buyer": tx["buyer"],
+            "issuer": tx["issuer"],
+            "ticker": tx["ticker"],
+            "trade_date": trade_date.where(trade_date != "", tx["period"]),
+            "filing_date": tx["filing_date"],
+            "price": price.where(price != "", note_avg),
+            "price_min_from_note": tx["note_min"].map(lambda v: v or ""),
+            "price_max_from_note": tx["note_max"].map(lambda v: v or ""),
+            "shares": tx["TRANS_SHARES"].str.strip(),
+            "transaction_code": tx["TRANS_CODE"].str.strip(),
+            "accession_url": EDGAR_ARCHIVES
+            + "edgar/data/"
+            + tx["ISSUERCIK"].str.lstrip("0")
+            + "/"
+            + tx["ACCESSION_NUMBER"],
+            "xml_url": "",
+        },
+        columns=CSV_FIELDS,
+    )
+
+
+def process_zip(
+    path: str,
+    allowed_codes: set,
+    tenpct_required: bool,
+    drop_otc: bool,
+    start: Optional[str],
+    end: Optional[str],
+    chunksize: int,
+) -> pd.DataFrame:
+    with zipfile.ZipFile(path) as zf:
+        sub = load_submissions(zf, drop_otc, start, end)
+        own = load_owners(zf, sub.index, tenpct_required)
+        tx = kept_transactions(zf, sub, own, allowed_codes, chunksize)
+        if tx.empty:
+            return pd.DataFrame(columns=CSV_FIELDS)
+        tx["sk"] = pd.to_numeric(tx["NONDERIV_TRANS_SK"], errors="coerce")
+        tx = tx.sort_values(["filing_date", "ACCESSION_NUMBER", "sk", "owner_seq"])
+        tx = add_note_prices(zf, tx, chunksize)
+    return to_rows(tx)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--zips", nargs="+", required=True, help="YYYYqN_form345.zip files")
+    ap.add_argument("--csv", required=True, help="Output CSV path (overwritten each run)")
+    ap.add_argument("--include_codes", default="P,C")
+    ap.add_argument("--no_tenpct_filter", action="store_true")
+    ap.add_argument("--keep_otc", action="store_true")
+    ap.add_argument("--start", default=None, help="First filing date YYYY-MM-DD")
+    ap.add_argument("--end", default=None, help="Last filing date YYYY-MM-DD")
+    ap.add_argument(
+        "--chunksize", type=int, default=200_000, help="TSV rows read per chunk"
+    )
+    args = ap.parse_args()
+
+    allowed_codes = {
+        c.strip().upper() for c in args.include_codes.split(",") if c.strip()
+    }
+    total = 0
+    with open(args.csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w.writeheader()
+        for path in sorted(args.zips):
+            rows = process_zip(
+                path,
+                allowed_codes,
+                not args.no_tenpct_filter,
+                not args.keep_otc,
+                args.start,
+                args.end,
+                args.chunksize,
+            )
+            rows.to_csv(f, header=False, index=False)
+            total += len(rows)
+            print(f"{path}: kept {len(rows)}")
+    print(f"Done. Total kept: {total}")
+
+
+if __name__ == "__main__":
+    main()
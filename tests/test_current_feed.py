@@ -0,0 +1,120 @@
+"""
+The --watch feed: parsing getcurrent's Atom pages and paging through a busy
+interval.
+
+    python -m unittest discover tests
+"""
+
+import datetime as dt
+import os
+import re
+import sys
+import unittest
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schedule4_corporate_buys as m  # noqa: E402
+
+
+def entry(i: int, form: str = "4", cik: int = 0, role: str = "Issuer") -> str:
+    cik = cik or 1000000 + i
+    acc = f"{2000000 + i:010d}-26-{i:06d}"
+    return (
+        f"<entry><title>{form} - Company {i} ({cik:010d}) ({role})</title>"
+        f'<link href="https://www.sec.gov/Archives/edgar/data/{cik}/'
+        f'{acc.replace("-", "")}/{acc}-index.htm"/>'
+        f"<summary type=\"html\">&lt;b&gt;Filed:&lt;/b&gt; 2026-10-15 "
+        f"&lt;b&gt;AccNo:&lt;/b&gt; {acc} &lt;b&gt;Size:&lt;/b&gt; 5 KB</summary>"
+        f"<updated>2026-10-15T16:{i // 60 % 60:02d}:{i % 60:02d}-04:00</updated>"
+        f"<id>urn:tag:sec.gov,2008:accession-number={acc}</id></entry>"
+    )
+
+
+def feed(entries) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="ISO-8859-1" ?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>Latest Filings</title>'
+        + "".join(entries)
+        + "</feed>"
+    ).encode("latin-1")
+
+
+class ParseFeed(unittest.TestCase):
+    def test_keeps_form4_and_counts_every_entry(self):
+        raw = feed(
+            [
+                entry(1),
+                entry(1, cik=3000001, role="Reporting"),
+                entry(2, form="4/A"),
+                entry(3, form="424B2"),
+                entry(4, form="425"),
+                "<entry><title>malformed</title></entry>",
+            ]
+        )
+        filings, n_entries = m.parse_current_feed(raw)
+        self.assertEqual(n_entries, 6)
+        self.assertEqual(
+            [(f.schedule_type, f.cik, f.txt_path) for f, _ in filings],
+            [
+                ("4", "0001000001", "edgar/data/1000001/0002000001-26-000001.txt"),
+                ("4", "0003000001", "edgar/data/3000001/0002000001-26-000001.txt"),
+                ("4/A", "0001000002", "edgar/data/1000002/0002000002-26-000002.txt"),
+            ],
+        )
+        accepted = dt.datetime.fromisoformat("2026-10-15T16:00:01-04:00")
+        self.assertEqual(filings[0][1], accepted.timestamp())
+
+
+class FeedServer:
+    """Newest-first getcurrent pages over `entries`, as a requests.Session."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.starts = []
+
+    def get(self, url, headers=None, timeout=None):
+        start = int(re.search(r"start=(\d+)", url).group(1))
+        count = int(re.search(r"count=(\d+)", url).group(1))
+        self.starts.append(start)
+        r = requests.Response()
+        r.status_code = 200
+        r._content = feed(self.entries[start : start + count])
+        r.headers = CaseInsensitiveDict()
+        return r
+
+
+class Paging(unittest.TestCase):
+    def test_busy_interval_pages_past_other_forms(self):
+        # a third of what type=4 matches is 424B2, so pages hold fewer than
+        # PAGE Form 4s but are not the last one
+        old = [entry(i) for i in range(10)]
+        new = [
+            entry(i, form="424B2" if i % 3 == 0 else "4") for i in range(1000, 1300)
+        ]
+        server = FeedServer(old[::-1])
+        feed_ = m.CurrentFeed(server)
+        self.assertEqual(len(feed_.poll()), 10)
+
+        server.entries = new[::-1] + old[::-1]
+        server.starts.clear()
+        got = feed_.poll()
+        self.assertEqual(len(got), 200)
+        self.assertEqual(server.starts, [0, 100, 200, 300])
+        accepted = [a for _, a in got]
+        self.assertEqual(accepted, sorted(accepted))  # oldest first
+
+    def test_short_page_is_the_last(self):
+        server = FeedServer([entry(i) for i in range(5)][::-1])
+        feed_ = m.CurrentFeed(server)
+        feed_.poll()
+        server.entries = [entry(i) for i in range(100, 150)][::-1] + server.entries
+        server.starts.clear()
+        self.assertEqual(len(feed_.poll()), 50)
+        self.assertEqual(server.starts, [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Daily index fetching against an in-memory server: the Range fetch of the
+Form 4 block must parse like the whole file, and failures leave the day
+unfinished.
+
+    python -m unittest discover tests
+"""
+
+import contextlib
+import datetime as dt
+import io
+import os
+import random
+import re
+import sys
+import unittest
+from unittest import mock
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schedule4_corporate_buys as m  # noqa: E402
+
+DAY = dt.date(2026, 10, 14)
+URL = "https://www.sec.gov/Archives/edgar/daily-index/2026/QTR4/form.20261014.idx"
+
+
+def response(status: int, body: bytes, headers: dict) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    r.headers = CaseInsensitiveDict(headers)
+    r.url = URL
+    return r
+
+
+class ByteServer:
+    """Stands in for a requests.Session serving one file, Range included."""
+
+    def __init__(self, body: bytes, ranges: bool = True, error: bool = False):
+        self.body = body
+        self.ranges = ranges
+        self.error = error
+        self.requests = []  # Range header of each GET (None for a plain one)
+        self.timeouts = []
+
+    def get(self, url, headers=None, timeout=None):
+        rng = (headers or {}).get("Range")
+        self.requests.append(rng)
+        self.timeouts.append(timeout)
+        if self.error:
+            raise requests.exceptions.ConnectionError("circuit open for www.sec.gov")
+        if rng and self.ranges:
+            a, b = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", rng).groups())
+            b = min(b, len(self.body) - 1)
+            return response(
+                206,
+                self.body[a : b + 1],
+                {"Content-Range": f"bytes {a}-{b}/{len(self.body)}"},
+            )
+        return response(200, self.body, {})
+
+
+def index_body(before: int, form4: int, after: int, seed: int = 0) -> bytes:
+    """A daily index sorted by form type, like form.YYYYMMDD.idx."""
+    rnd = random.Random(seed)
+    forms = (
+        [rnd.choice(["10-K", "13F-HR", "3", "3/A"]) for _ in range(before)]
+        + [rnd.choice(["4", "4/A"]) for _ in range(form4)]
+        + [rnd.choice(["424B2", "5", "8-K", "SC 13G"]) for _ in range(after)]
+    )
+    rows = []
+    for i, form in enumerate(forms):
+        cik = 1000000 + i
+        name = "X" * rnd.randint(1, 40)
+        rows.append(
+            f"{form:<12}{name:<62}{cik:<12}{DAY:%Y%m%d}    "
+            f"edgar/data/{cik}/{cik:010d}-26-{i:06d}.txt"
+        )
+    rows.sort(key=lambda r: (r[:12].strip(), r))
+    header = (
+        "Description:           Daily Index of EDGAR Dissemination Feed\n\n"
+        "Form Type   Company Name                                                  "
+        "CIK         Date Filed  File Name\n" + "-" * 141 + "\n"
+    )
+    return (header + "\n".join(rows) + "\n").encode("latin-1")
+
+
+class RangeFetch(unittest.TestCase):
+    def setUp(self):
+        # small probes and chunks, so a short file has many chunk edges
+        for name, value in (("INDEX_PROBE_BYTES", 512), ("INDEX_STREAM_BYTES", 700)):
+            patch = mock.patch.object(m, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def check(self, body: bytes, ranges: bool = True) -> ByteServer:
+        server = ByteServer(body, ranges=ranges)
+        text = m.fetch_form_index(URL, DAY, server, mode="range")
+        expected = m.parse_schedule_index(m.decode_index_bytes(body))
+        self.assertEqual(m.parse_schedule_index(text), expected)
+        return server
+
+    def test_block_in_the_middle(self):
+        body = index_body(200, 40, 200)
+        server = self.check(body)
+        self.assertNotIn(None, server.requests)  # no full download
+        # bisection plus the block, far fewer than streaming the whole file
+        self.assertLess(len(server.requests), len(body) / m.INDEX_STREAM_BYTES / 3)
+
+    def test_block_at_the_start(self):
+        self.check(index_body(0, 40, 200))
+
+    def test_block_at_the_end(self):
+        self.check(index_body(200, 40, 0))
+
+    def test_no_form4_rows(self):
+        self.check(index_body(200, 0, 200))
+
+    def test_rows_across_chunk_edges(self):
+        # shifting the chunk size moves every edge through the block's rows
+        for stream in range(520, 1400, 23):
+            with self.subTest(stream=stream), mock.patch.object(
+                m, "INDEX_STREAM_BYTES", stream
+            ):
+                self.check(index_body(150, 60, 150, seed=stream))
+
+    def test_range_ignored(self):
+        server = self.check(index_body(200, 40, 200), ranges=False)
+        self.assertEqual(len(server.requests), 1)  # the 200 is used as is
+
+
+class FailedFetch(unittest.TestCase):
+    def setUp(self):
+        quiet = contextlib.redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def test_request_error_reads_as_missing_index(self):
+        for mode in ("full", "range"):
+            with self.subTest(mode=mode):
+                session = ByteServer(b"", error=True)
+                self.assertIsNone(m.fetch_form_index(URL, DAY, session, mode=mode))
+
+    def test_process_date_leaves_day_unfinished(self):
+        with self.assertRaises(m.IndexUnavailable):
+            m.process_date(
+                DAY,
+                None,
+                ByteServer(b"", error=True),
+                sleep_s=0,
+                allowed_codes={"P"},
+                tenpct_required=False,
+                drop_otc=False,
+                print_passed=False,
+            )
+
+
+class FetchDeadline(unittest.TestCase):
+    def test_requests_time_out_with_the_deadline(self):
+        deadline = m.Deadline(0.1)  # six seconds
+        server = ByteServer(index_body(200, 40, 200))
+        m.fetch_form_index(URL, DAY, server, mode="range", deadline=deadline)
+        self.assertGreater(len(server.timeouts), 1)
+        self.assertTrue(all(0 < t <= 6 for t in server.timeouts), server.timeouts)
+
+    def test_no_request_past_the_deadline(self):
+        deadline = m.Deadline(0.1)
+        deadline.at -= 6
+        server = ByteServer(index_body(200, 40, 200))
+        for mode in ("full", "range"):
+            with self.subTest(mode=mode), self.assertRaises(m.DeadlineReached):
+                m.fetch_form_index(URL, DAY, server, mode=mode, deadline=deadline)
+        with self.assertRaises(m.DeadlineReached):
+            m.backfill_filings(DAY, DAY, server, deadline=deadline)
+        with self.assertRaises(m.DeadlineReached):
+            m.recent_available_days(1, server, deadline=deadline)
+        with self.assertRaises(m.DeadlineReached):
+            m.IssuerMap.load(server, deadline=deadline)
+        self.assertEqual(server.requests, [])
+        self.assertTrue(deadline.reached)
+
+
+if __name__ == "__main__":
+    unittest.main()
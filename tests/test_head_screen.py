@@ -0,0 +1,198 @@
+"""
+--head_screen: HeadDoc may only decide what parse_form4_filtered would, from
+any prefix of a filing, and screened_get stops a rejected download early.
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import unittest
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schedule4_corporate_buys as m  # noqa: E402
+import schedule4_http as h  # noqa: E402
+
+CODES = {"P"}
+OWNERS = {
+    "corporate 10%": [("Acme Capital Partners LP", "true")],
+    "corporate": [("Beta Holdings Inc", "false")],
+    "individual": [("John Smith", "true")],
+    "mixed": [("John Smith", "true"), ("Acme Capital Partners LP", "1")],
+}
+
+
+def form4(
+    symbol: str,
+    owners,
+    codes,
+    issuer_last: bool = False,
+    derivative_code: str = "",
+    remarks: str = "",
+) -> bytes:
+    issuer = (
+        "<issuer><issuerCik>0001234567</issuerCik><issuerName>Example Corp</issuerName>"
+        f"<issuerTradingSymbol>{symbol}</issuerTradingSymbol></issuer>"
+    )
+    owner_xml = "".join(
+        f"<reportingOwner><reportingOwnerId><rptOwnerCik>000765432{i}</rptOwnerCik>"
+        f"<rptOwnerName>{name}</rptOwnerName></reportingOwnerId>"
+        "<reportingOwnerRelationship>"
+        f"<isTenPercentOwner>{ten}</isTenPercentOwner>"
+        "</reportingOwnerRelationship></reportingOwner>"
+        for i, (name, ten) in enumerate(owners)
+    )
+    table = (
+        "<nonDerivativeTable>"
+        + "".join(
+            "<nonDerivativeTransaction><securityTitle><value>Common</value></securityTitle>"
+            "<transactionDate><value>2026-10-13</value></transactionDate>"
+            f"<transactionCoding><transactionCode>{code}</transactionCode></transactionCoding>"
+            "<transactionAmounts><transactionShares><value>1000</value></transactionShares>"
+            "<transactionPricePerShare><value>12.25</value></transactionPricePerShare>"
+            "</transactionAmounts></nonDerivativeTransaction>"
+            for code in codes
+        )
+        + "</nonDerivativeTable>"
+    )
+    if derivative_code:
+        table += (
+            "<derivativeTable><derivativeTransaction><transactionCoding>"
+            f"<transactionCode>{derivative_code}</transactionCode>"
+            "</transactionCoding></derivativeTransaction></derivativeTable>"
+        )
+    body = owner_xml + table + issuer if issuer_last else issuer + owner_xml + table
+    return (
+        '<?xml version="1.0"?>\n<ownershipDocument><schemaVersion>X0508</schemaVersion>'
+        "<documentType>4</documentType><periodOfReport>2026-10-13</periodOfReport>"
+        + body
+        + f"<remarks>{remarks}</remarks></ownershipDocument>\n"
+    ).encode()
+
+
+def submission(xml: bytes) -> bytes:
+    """The same document inside the full submission .txt."""
+    return (
+        b"<SEC-DOCUMENT>0001234567-26-000001.txt\n<DOCUMENT>\n<TYPE>4\n<TEXT>\n<XML>\n"
+        + xml
+        + b"</XML>\n</TEXT>\n</DOCUMENT>\n</SEC-DOCUMENT>\n"
+    )
+
+
+def samples():
+    for symbol, owners, codes, issuer_last, derivative in itertools.product(
+        ("EXMP", "EXMP.PK"),
+        OWNERS,
+        (("P",), ("S",), ("S", "P"), ()),
+        (False, True),
+        ("", "P"),
+    ):
+        name = f"{symbol} {owners} {codes} issuer_last={issuer_last} deriv={derivative}"
+        yield name, form4(symbol, OWNERS[owners], codes, issuer_last, derivative)
+
+
+def screens():
+    for tenpct, drop_otc in itertools.product((True, False), repeat=2):
+        yield m.HeadScreen(CODES, tenpct, drop_otc)
+
+
+class VerdictMatchesFullParse(unittest.TestCase):
+    def check(self, name: str, xml: bytes, wrap=lambda b: b) -> None:
+        body = wrap(xml)
+        for screen in screens():
+            _, rows, _ = m.parse_form4_filtered(
+                xml, CODES, screen.tenpct_required, screen.drop_otc
+            )
+            rejected = not rows
+            label = f"{name} tenpct={screen.tenpct_required} otc={screen.drop_otc}"
+            with self.subTest(label):
+                # the whole document, in small chunks: always decided, and right
+                doc = screen.doc()
+                for i in range(0, len(body), 61):
+                    doc.feed(body[i : i + 61])
+                self.assertEqual(doc.verdict, rejected)
+                # a truncated download: undecided or right, never wrong
+                for cut in range(0, len(body), 17):
+                    doc.reset()
+                    verdict = doc.feed(body[:cut])
+                    if verdict is not None:
+                        self.assertEqual(verdict, rejected, f"cut at {cut}")
+
+    def test_bare_xml(self):
+        for name, xml in samples():
+            self.check(name, xml)
+
+    def test_submission_txt(self):
+        for name, xml in samples():
+            self.check(name, xml, submission)
+
+    def test_rejects_before_the_end(self):
+        # the head is enough to rule out an OTC issuer, an individual owner or
+        # the wrong codes, so most of a long document is never read
+        for xml in (
+            form4("EXMP.PK", OWNERS["corporate 10%"], ("P",), remarks="x" * 5000),
+            form4("EXMP", OWNERS["individual"], ("P",), remarks="x" * 5000),
+            form4("EXMP", OWNERS["corporate 10%"], ("S",), remarks="x" * 5000),
+        ):
+            doc = m.HeadScreen(CODES, True, True).doc()
+            self.assertTrue(doc.feed(xml[: len(xml) - 4000]))
+
+    def test_issuer_after_transactions_waits_for_the_issuer(self):
+        xml = form4("EXMP.PK", OWNERS["corporate 10%"], ("P",), issuer_last=True)
+        doc = m.HeadScreen(CODES, True, True).doc()
+        self.assertIsNone(doc.feed(xml[: xml.index(b"<issuer>")]))
+        self.assertTrue(doc.feed(xml[xml.index(b"<issuer>") :]))
+
+
+class ScreenedGet(unittest.TestCase):
+    CHUNK = 4096
+
+    def get(self, body: bytes, screen: m.HeadScreen):
+        sent = []
+
+        async def stream():
+            for i in range(0, len(body), self.CHUNK):
+                sent.append(i)
+                yield body[i : i + self.CHUNK]
+
+        def handler(request):
+            return httpx.Response(
+                200, headers={"content-length": str(len(body))}, content=stream()
+            )
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+                doc = screen.doc()
+                r = await h.screened_get(c, "https://www.sec.gov/x.txt", None, doc)
+                return r, doc
+
+        r, doc = asyncio.run(run())
+        return r, doc, len(sent) * self.CHUNK
+
+    def test_rejected_download_stops_early(self):
+        screen = m.HeadScreen(CODES, True, True)
+        body = submission(
+            form4("EXMP.PK", OWNERS["corporate 10%"], ("P",), remarks="x" * 200_000)
+        )
+        r, doc, sent = self.get(body, screen)
+        self.assertTrue(doc.rejected)
+        self.assertLess(sent, len(body) // 4)
+        self.assertLess(len(r.content), len(body))
+        self.assertEqual((screen.rejected, screen.bytes_read), (1, sent))
+
+    def test_kept_download_is_complete(self):
+        screen = m.HeadScreen(CODES, True, True)
+        xml = form4("EXMP", OWNERS["corporate 10%"], ("P",), remarks="x" * 200_000)
+        r, doc, _ = self.get(submission(xml), screen)
+        self.assertFalse(doc.rejected)
+        self.assertEqual(r.content, submission(xml))
+        self.assertEqual(screen.rejected, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+schedule4_http pieces the async engine leans on.
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import fcntl
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schedule4_http as h  # noqa: E402
+
+
+class SharedBudgetOnTheLoop(unittest.TestCase):
+    def test_locked_budget_does_not_stall_the_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            budget = h.SharedBudget(os.path.join(tmp, "budget.json"), rps=100)
+            held = open(budget.path, "a+")
+            self.addCleanup(held.close)
+            fcntl.flock(held, fcntl.LOCK_EX)  # another process's request
+            threading.Timer(0.3, fcntl.flock, (held, fcntl.LOCK_UN)).start()
+
+            async def run():
+                ticks = 0
+
+                async def tick():
+                    nonlocal ticks
+                    while True:
+                        await asyncio.sleep(0.01)
+                        ticks += 1
+
+                ticker = asyncio.ensure_future(tick())
+                await budget.acquire()
+                ticker.cancel()
+                return ticks
+
+            self.assertGreater(asyncio.run(run()), 10)
+
+
+class Hedging(unittest.TestCase):
+    def test_cancelled_caller_gives_back_the_pending_slot(self):
+        state = {}
+
+        class Client:
+            async def get(self, url, headers=None, timeout=None):
+                await asyncio.sleep(3600)  # a request that never answers
+
+        class Limiter:
+            async def acquire(self):
+                state["waiting"] = True
+                try:
+                    await asyncio.sleep(3600)  # no slot free
+                except asyncio.CancelledError:
+                    state["cancelled"] = True
+                    raise
+
+        hedger = h.Hedger()
+        hedger.delay = lambda host: 0.01
+
+        async def run():
+            call = asyncio.ensure_future(
+                hedger.get(Client(), "https://www.sec.gov/x", None, Limiter())
+            )
+            await asyncio.sleep(0.1)
+            call.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await call
+            await asyncio.sleep(0)
+            # checked before asyncio.run() cancels whatever is left over
+            self.assertEqual(state, {"waiting": True, "cancelled": True})
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Kill-and-resume runs of schedule4_corporate_buys.main() must write the same
+rows as an uninterrupted run. Every filing is served from a pre-filled XML
+cache and the index is patched in, so no request leaves the machine.
+
+    python -m unittest discover tests
+"""
+
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schedule4_corporate_buys as m  # noqa: E402
+
+DAY = "2026-10-14"
+N_FILINGS = 8
+
+
+class Killed(BaseException):
+    """Stands in for the process dying; nothing in the scraper catches it."""
+
+
+def form4_xml(i: int) -> bytes:
+    return (
+        '<?xml version="1.0"?>\n<ownershipDocument><documentType>4</documentType>'
+        f"<issuer><issuerCik>{2000000 + i % 3:010d}</issuerCik>"
+        f"<issuerName>Issuer {i % 3}</issuerName>"
+        f"<issuerTradingSymbol>SY{i % 3}</issuerTradingSymbol></issuer>"
+        f"<reportingOwner><reportingOwnerId><rptOwnerCik>{3000000 + i:010d}</rptOwnerCik>"
+        f"<rptOwnerName>Acme Capital Partners LP {i}</rptOwnerName></reportingOwnerId>"
+        "<reportingOwnerRelationship><isTenPercentOwner>true</isTenPercentOwner>"
+        "</reportingOwnerRelationship></reportingOwner><nonDerivativeTable>"
+        + "".join(
+            "<nonDerivativeTransaction><securityTitle><value>Common</value></securityTitle>"
+            f"<transactionDate><value>2026-10-1{k}</value></transactionDate>"
+            "<transactionCoding><transactionCode>P</transactionCode></transactionCoding>"
+            f"<transactionAmounts><transactionShares><value>{100 * (k + 1)}</value>"
+            "</transactionShares><transactionPricePerShare><value>10.50</value>"
+            "</transactionPricePerShare></transactionAmounts></nonDerivativeTransaction>"
+            for k in range(1 + i % 2)
+        )
+        + "</nonDerivativeTable></ownershipDocument>\n"
+    ).encode()
+
+
+def index_and_cache(cache_dir: str) -> str:
+    """Daily index text listing each filing under its issuer and its owner."""
+    cache = m.XmlCache(os.path.join(cache_dir, "xml"))
+    lines = []
+    for i in range(N_FILINGS):
+        acc = f"{3000000 + i:010d}-26-{i:06d}"
+        for cik in (2000000 + i % 3, 3000000 + i):
+            txt_path = f"edgar/data/{cik}/{acc}.txt"
+            lines.append(
+                f"{'4':<12}{'NAME ' + str(cik):<62}{cik:<12}"
+                f"{DAY.replace('-', ''):<12}{txt_path}"
+            )
+        cache.put(txt_path, m.accession_url(txt_path) + "/form4.xml", form4_xml(i))
+    return "\n".join(sorted(lines)) + "\n"
+
+
+class KillAndResume(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        index = index_and_cache(self.cache_dir)
+        patch = mock.patch.object(
+            m, "fetch_daily_schedule_index", lambda *a, **k: index
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def run_main(self, *args: str, kill_after: int = 0) -> None:
+        argv = [
+            "schedule4_corporate_buys.py", "--date", DAY, "--include_codes", "P",
+            "--keep_otc", "--sleep", "0", "--no_shared_budget",
+            "--cache_dir", self.cache_dir, *args,
+        ]  # fmt: skip
+        mark = m.RunLedger.mark
+        written = []
+
+        def dying_mark(ledger, filing, status, rows=0):
+            mark(ledger, filing, status, rows)
+            if status == m.RunLedger.WRITTEN:
+                written.append(filing)
+                if len(written) == kill_after:
+                    raise Killed  # rows are in the file, not yet committed
+
+        with mock.patch.object(sys, "argv", argv), mock.patch.object(
+            m.RunLedger, "mark", dying_mark
+        ), contextlib.redirect_stdout(io.StringIO()):
+            if kill_after:
+                with self.assertRaises(Killed):
+                    m.main()
+            else:
+                m.main()
+
+    def read_rows(self, path: str) -> list:
+        with open(path, newline="", encoding="utf-8") as fh:
+            return list(csv.reader(fh))
+
+    def check(self, engine: str, out_args, path: str) -> None:
+        self.run_main("--engine", engine, *out_args("full"))
+        full = self.read_rows(path("full"))
+        col = full[0].index("accession_url")
+        accessions = {m.accession_of(row[col] + ".txt") for row in full[1:]}
+        self.assertEqual(len(accessions), N_FILINGS)
+        self.assertEqual(
+            len(full) - 1, sum(1 + i % 2 for i in range(N_FILINGS))
+        )  # each filing once, although the index lists it twice
+        for kill_after in range(1, N_FILINGS):
+            with self.subTest(kill_after=kill_after):
+                name = f"killed{kill_after}"
+                self.run_main("--engine", engine, *out_args(name), kill_after=kill_after)
+                self.run_main("--engine", engine, *out_args(name))
+                self.assertEqual(self.read_rows(path(name)), full)
+
+    def test_resume_csv(self):
+        for engine in ("sync", "async"):
+            with self.subTest(engine=engine):
+                self.check(
+                    engine,
+                    lambda name: ("--csv", self.csv_path(engine, name), "--resume"),
+                    lambda name: self.csv_path(engine, name),
+                )
+
+    def test_resume_out_dir(self):
+        for engine in ("sync", "async"):
+            with self.subTest(engine=engine):
+                self.check(
+                    engine,
+                    lambda name: ("--out_dir", self.out_dir(engine, name)),
+                    lambda name: os.path.join(
+                        self.out_dir(engine, name), DAY[:4], f"form4_{DAY}.csv"
+                    ),
+                )
+
+    def test_changed_filters_refuse_finished_out_dir(self):
+        out = self.out_dir("sync", "filters")
+        self.run_main("--engine", "sync", "--out_dir", out)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            self.run_main("--engine", "sync", "--out_dir", out, "--include_codes", "P,S")
+
+    def test_missing_index_leaves_day_unfinished(self):
+        for engine in ("sync", "async"):
+            with self.subTest(engine=engine):
+                out = self.out_dir(engine, "noindex")
+                path = os.path.join(out, DAY[:4], f"form4_{DAY}.csv")
+                with mock.patch.object(
+                    m, "fetch_daily_schedule_index", lambda *a, **k: None
+                ):
+                    self.run_main("--engine", engine, "--out_dir", out)
+                self.assertFalse(os.path.exists(path))
+                self.run_main("--engine", engine, "--out_dir", out)
+                self.assertEqual(
+                    len(self.read_rows(path)) - 1,
+                    sum(1 + i % 2 for i in range(N_FILINGS)),
+                )
+
+    def test_index_without_form4_rows_finishes_day(self):
+        out = self.out_dir("sync", "empty")
+        with mock.patch.object(m, "fetch_daily_schedule_index", lambda *a, **k: ""):
+            self.run_main("--engine", "sync", "--out_dir", out)
+        path = os.path.join(out, DAY[:4], f"form4_{DAY}.csv")
+        self.assertEqual(len(self.read_rows(path)), 1)  # header only
+
+    def csv_path(self, engine: str, name: str) -> str:
+        return os.path.join(self.tmp, f"{engine}-{name}.csv")
+
+    def out_dir(self, engine: str, name: str) -> str:
+        return os.path.join(self.tmp, f"{engine}-{name}")
+
+
+class RetryQueue(unittest.TestCase):
+    def test_deferred_filing_keeps_its_attempts(self):
+        ledger = m.RunLedger(":memory:")
+        self.addCleanup(ledger.close)
+        txt_path = "edgar/data/3000000/0003000000-26-000000.txt"
+        f = m.FilingRef("3000000", "NAME", "4", DAY, txt_path)
+        ledger.mark(f, m.RunLedger.FAILED)
+        ledger.mark(f, m.RunLedger.DEFERRED)
+        ledger.commit("out.csv", 0)
+        status, attempts, next_at = ledger.db.execute(
+            "SELECT status, attempts, next_at FROM filings"
+        ).fetchone()
+        self.assertEqual((status, attempts), (m.RunLedger.FAILED, 1))
+        self.assertIsNotNone(next_at)
+        self.assertEqual((ledger.failed, ledger.deferred), (1, 1))
+
+    def test_failures_walk_the_whole_backoff_schedule(self):
+        ledger = m.RunLedger(":memory:")
+        self.addCleanup(ledger.close)
+        txt_path = "edgar/data/3000000/0003000000-26-000000.txt"
+        f = m.FilingRef("3000000", "NAME", "4", DAY, txt_path)
+        waits = []
+        for _ in range(m.RunLedger.MAX_ATTEMPTS):
+            before = time.time()
+            ledger.mark(f, m.RunLedger.FAILED)
+            ledger.commit("out.csv", 0)
+            (next_at,) = ledger.db.execute("SELECT next_at FROM filings").fetchone()
+            waits.append(None if next_at is None else round(next_at - before))
+        self.assertEqual(waits, [*m.RunLedger.RETRY_DELAYS_S, None])
+        self.assertEqual(len(ledger.given_up()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()